@@ -0,0 +1 @@
+"""Data layer for the Beauty Intelligence Dashboard (catalog, storage, analytics)."""
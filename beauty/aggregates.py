@@ -0,0 +1,164 @@
+"""
+Materialized counters over saved interactions.
+
+An AggregateStore folds records into per-field counters and remembers the
+source cursor it has consumed up to, so each refresh only reads what was
+appended since. The state is snapshotted to JSON and can always be rebuilt
+from the interaction log:
+
+    python -m beauty.aggregates rebuild --data-dir beauty_data
+"""
+
+import argparse
+import heapq
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+COUNTED_FIELDS = ("product_name", "brand", "skin_type", "price_range")
+
+
+def record_epoch(rec):
+    """Seconds since epoch for a record's timestamp (ISO string or datetime); None if unparseable."""
+    ts = rec.get("timestamp")
+    if isinstance(ts, str):
+        try:
+            ts = datetime.fromisoformat(ts)
+        except ValueError:
+            return None
+    if not isinstance(ts, datetime):
+        return None
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.timestamp()
+
+
+class AggregateStore:
+    """Counters per product/brand/skin type/price range."""
+
+    def __init__(self, path=None, save_interval=5.0, chunk_records=50_000):
+        self.path = path
+        self.save_interval = save_interval
+        self.chunk_records = chunk_records
+        self._lock = threading.Lock()
+        self._last_save = 0.0
+        self.version = 0
+        self._reset()
+        if path and os.path.exists(path):
+            self._load()
+
+    def _reset(self):
+        self.counts = {f: {} for f in COUNTED_FIELDS}
+        self.total = 0
+        self.cursor = 0
+        self.version += 1  # never reused, so a top() computed before a rebuild is never served after it
+        self._top_cache = {}
+
+    # ---------------- updates ----------------
+    def apply(self, records):
+        """Fold records into the counters."""
+        if not records:
+            return
+        with self._lock:
+            self._apply(records)
+
+    def _apply(self, records):
+        for rec in records:
+            for f in COUNTED_FIELDS:
+                key = rec.get(f)
+                if key is not None:
+                    counter = self.counts[f]
+                    counter[key] = counter.get(key, 0) + 1
+        self.total += len(records)
+        self.version += 1
+
+    def catch_up(self, source):
+        """Apply everything past our cursor, chunk by chunk. Returns the number of new records."""
+        added = 0
+        with self._lock:
+            while True:
+                records, cursor = source.read_since(self.cursor, max_records=self.chunk_records)
+                self._apply(records)
+                self.cursor = cursor
+                added += len(records)
+                if len(records) < self.chunk_records:
+                    break
+            if added and self.path and time.monotonic() - self._last_save >= self.save_interval:
+                self._save()
+            return added
+
+    def rebuild(self, source):
+        """Drop all state and recompute it from the start of `source`."""
+        with self._lock:
+            self._reset()
+        self.catch_up(source)
+        self.save()
+
+    # ---------------- reads ----------------
+    def top(self, field, n=10):
+        """[(key, count)] for the n most frequent values of `field`, cached per store version."""
+        with self._lock:  # another session's catch_up may be updating the counters
+            version = self.version
+            cached = self._top_cache.get((field, n))
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            items = list(self.counts[field].items())
+        top = heapq.nsmallest(n, items, key=lambda kv: (-kv[1], str(kv[0])))
+        self._top_cache[(field, n)] = (version, top)
+        return top
+
+    def keys(self, field):
+        """Every value of `field` counted so far (unordered)."""
+        with self._lock:
+            return list(self.counts[field])
+
+    # ---------------- persistence ----------------
+    def save(self):
+        if self.path:
+            with self._lock:
+                self._save()
+
+    def _save(self):
+        state = {
+            "cursor": self.cursor,
+            "total": self.total,
+            "counts": self.counts,
+        }
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, default=str)
+        os.replace(tmp, self.path)
+        self._last_save = time.monotonic()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return  # unreadable snapshot: start empty and catch up from the log
+        self.cursor = state["cursor"]
+        self.total = state["total"]
+        self.counts = {f: dict(state["counts"].get(f, {})) for f in COUNTED_FIELDS}
+
+
+def main(argv=None):
+    from beauty.interaction_db import InteractionDB
+    from beauty.rollups import TimeSeriesRollup
+
+    parser = argparse.ArgumentParser(description="Maintain the saved-interaction aggregate snapshot.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rebuild = sub.add_parser("rebuild", help="recompute the snapshot and time-series rollups from the interaction store")
+    rebuild.add_argument("--data-dir", default=os.environ.get("BEAUTY_DATA_DIR", "beauty_data"))
+    args = parser.parse_args(argv)
+
+    source = InteractionDB(os.path.join(args.data_dir, "interactions.sqlite"))
+    store = AggregateStore(os.path.join(args.data_dir, "local_aggregates.json"))
+    store.rebuild(source)
+    TimeSeriesRollup(os.path.join(args.data_dir, "local_rollups.npz")).rebuild(source)
+    print(f"Rebuilt aggregates and rollups from {store.total} records (cursor {store.cursor}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Per-brand statistics precomputed from the catalog.
+
+One array entry per brand code (the catalog's `brand_code`), so lookups for a
+brand selection are plain fancy indexing: O(selected), however many brands the
+CSV has. The table is derived with np.bincount in one pass and cached on disk
+as .npz keyed by the CSV's hash.
+"""
+
+import os
+
+import numpy as np
+
+# Price tiers (₹): (upper bound, label); the last tier is open-ended.
+PRICE_TIERS = ((1000.0, "Budget"), (4000.0, "Mid-range"), (np.inf, "Luxury"))
+TIER_NAMES = [label for _, label in PRICE_TIERS]
+
+_FIELDS = ("products", "loves", "reviews", "rating_mean", "price_median", "tier")
+
+
+def price_tier(price):
+    """Tier label for one price in rupees."""
+    for bound, label in PRICE_TIERS:
+        if price < bound:
+            return label
+    return PRICE_TIERS[-1][1]
+
+
+class BrandStats:
+    """
+    Columnar brand table indexed by brand code.
+
+    products / loves / reviews are totals; rating_mean averages the brand's
+    rated products; tier is an index into TIER_NAMES from the median price.
+    """
+
+    def __init__(self, brand_names, columns):
+        self.brand_names = brand_names
+        for name in _FIELDS:
+            setattr(self, name, columns[name])
+        self._index = {b: i for i, b in enumerate(brand_names)}
+
+    def __len__(self):
+        return len(self.brand_names)
+
+    @classmethod
+    def from_catalog(cls, catalog):
+        n = len(catalog.brand_names)
+        code = catalog.brand_code
+        products = np.bincount(code, minlength=n).astype(np.int32)
+        rated = catalog.rating > 0
+        rated_count = np.bincount(code[rated], minlength=n)
+        rating_sum = np.bincount(code[rated], weights=catalog.rating[rated], minlength=n)
+        # median price per brand: sort by (brand, price), take the middle of each run
+        order = np.lexsort((catalog.price, code))
+        starts = np.concatenate(([0], np.cumsum(products)[:-1]))
+        sorted_price = catalog.price[order]
+        price_median = np.zeros(n, dtype=np.float32)
+        has = products > 0
+        lo = starts[has] + (products[has] - 1) // 2
+        hi = starts[has] + products[has] // 2
+        price_median[has] = (sorted_price[lo] + sorted_price[hi]) / 2
+        bounds = np.array([b for b, _ in PRICE_TIERS[:-1]], dtype=np.float32)
+        columns = {
+            "products": products,
+            "loves": np.bincount(code, weights=catalog.loves, minlength=n).astype(np.int64),
+            "reviews": np.bincount(code, weights=catalog.reviews, minlength=n).astype(np.int64),
+            "rating_mean": np.divide(rating_sum, rated_count, out=np.zeros(n), where=rated_count > 0).astype(np.float32),
+            "price_median": price_median,
+            "tier": np.searchsorted(bounds, price_median, side="right").astype(np.int8),
+        }
+        return cls(list(catalog.brand_names), columns)
+
+    # ---------------- persistence ----------------
+    def save(self, path):
+        tmp = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp, brand_names=np.array(self.brand_names, dtype=str), **{f: getattr(self, f) for f in _FIELDS})
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["brand_names"].tolist(), {f: data[f] for f in _FIELDS})
+
+    # ---------------- lookups ----------------
+    def codes(self, names):
+        """Codes for the given brand names, in order; unknown names are dropped."""
+        return np.array([self._index[b] for b in names if b in self._index], dtype=np.int32)
+
+    def by_popularity(self):
+        """Brand names, most-loved first."""
+        return [self.brand_names[i] for i in np.argsort(-self.loves, kind="stable")]
+
+    def leader_and_laggard(self, names):
+        """(most-loved, least-loved) brand code among `names`, or None if none are known."""
+        codes = self.codes(names)
+        if not len(codes):
+            return None
+        loves = self.loves[codes]
+        return int(codes[np.argmax(loves)]), int(codes[np.argmin(loves)])
+
+    def by_tier(self, names):
+        """{tier label: [brand names]} for the given brands, in tier order."""
+        codes = self.codes(names)
+        out = {label: [] for label in TIER_NAMES}
+        for c in codes:
+            out[TIER_NAMES[self.tier[c]]].append(self.brand_names[c])
+        return out
+
+
+def load_or_build_brand_stats(catalog, cache_dir):
+    """Load the table for this catalog version from cache_dir, computing it on first use."""
+    if not catalog.digest:
+        return BrandStats.from_catalog(catalog)
+    path = os.path.join(cache_dir, f"brand-stats-{catalog.digest[:16]}.npz")
+    if os.path.exists(path):
+        return BrandStats.load(path)
+    stats = BrandStats.from_catalog(catalog)
+    os.makedirs(cache_dir, exist_ok=True)
+    stats.save(path)
+    return stats
@@ -0,0 +1,169 @@
+"""
+Process-wide cache for expensive resources (clients, stores, static figures).
+
+Streamlit re-executes the whole script on every interaction; factories wrapped
+with `resources.memoize(namespace)` run once per distinct argument set per
+process and are shared by all sessions until explicitly invalidated. As with
+st.cache_resource, parameters whose name starts with "_" are not part of the
+key, which lets unhashable objects (e.g. a Firestore client) be passed through.
+
+The storage backend is pluggable: anything with get/set/delete/delete_namespace/
+clear that returns `MISSING` on a miss (expired entries included), the values
+it replaced or evicted from set, and the dropped values from delete_namespace
+can replace MemoryBackend.
+"""
+
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+
+MISSING = object()
+
+
+def _make_key(namespace, sig, args, kwargs):
+    bound = sig.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return (namespace,) + tuple((name, v) for name, v in bound.arguments.items() if not name.startswith("_"))
+
+
+class MemoryBackend:
+    """Dict-backed store; entries are (value, expires_at or None)."""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+        value, expires_at = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            return MISSING  # left in place until set() replaces it, so it is disposed like any other drop
+        return value
+
+    def set(self, key, value, ttl=None, max_entries=None):
+        """Store `value`; returns the values it replaced or evicted."""
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            dropped = [] if previous is None else [previous[0]]
+            self._entries[key] = (value, None if ttl is None else time.monotonic() + ttl)
+            if max_entries is not None:
+                # Entries are kept in insertion order: evict this namespace's oldest.
+                same = [k for k in self._entries if k[0] == key[0]]
+                for old in same[:len(same) - max_entries]:
+                    dropped.append(self._entries.pop(old)[0])
+            return dropped
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_namespace(self, namespace):
+        """Drop every entry of `namespace`; returns their values."""
+        with self._lock:
+            return [self._entries.pop(key)[0] for key in [k for k in self._entries if k[0] == namespace]]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class ResourceCache:
+    """Namespaced memoization of factory functions with explicit invalidation."""
+
+    def __init__(self, backend=None):
+        self.backend = backend or MemoryBackend()
+        self._build_locks = {}  # key -> [lock, holders and waiters]
+        self._lock = threading.Lock()
+        self._namespaces = set()
+        self._disposers = {}
+
+    @contextmanager
+    def _building(self, key):
+        """Hold the build lock for `key`; it is dropped once nobody holds or waits for it."""
+        with self._lock:
+            entry = self._build_locks.get(key)
+            if entry is None:
+                entry = self._build_locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._build_locks[key]
+
+    def _dispose(self, namespace, values):
+        dispose = self._disposers.get(namespace)
+        if dispose is not None:
+            for value in values or ():
+                dispose(value)
+
+    def memoize(self, namespace, ttl=None, max_entries=None, dispose=None):
+        """
+        Decorator: cache the factory's result under (namespace, hashed arguments).
+
+        ttl: seconds before an entry is rebuilt. max_entries: keep at most this
+        many argument sets for the namespace (oldest evicted first). dispose:
+        called with each value dropped by `invalidate`, eviction or expiry
+        (e.g. to close a store).
+        """
+        self._namespaces.add(namespace)
+        if dispose is not None:
+            self._disposers[namespace] = dispose
+
+        def decorator(fn):
+            sig = inspect.signature(fn)
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                key = _make_key(namespace, sig, args, kwargs)
+                value = self.backend.get(key)
+                if value is not MISSING:
+                    return value
+                # One build per key even when several sessions miss at once.
+                with self._building(key):
+                    value = self.backend.get(key)
+                    if value is MISSING:
+                        value = fn(*args, **kwargs)
+                        self._dispose(namespace, self.backend.set(key, value, ttl, max_entries))
+                return value
+
+            wrapper.namespace = namespace
+            wrapper.invalidate = lambda: self.invalidate(namespace)
+            return wrapper
+
+        return decorator
+
+    def prime(self, factory, value, *args, **kwargs):
+        """
+        Store `value` as the result of factory(*args, **kwargs), e.g. to inject a
+        fake client. `factory` may also be a namespace name, in which case the
+        keyed arguments must be given as keywords in declaration order.
+        """
+        if isinstance(factory, str):
+            key = (factory,) + tuple((k, v) for k, v in kwargs.items() if not k.startswith("_"))
+        else:
+            key = _make_key(factory.namespace, inspect.signature(factory.__wrapped__), args, kwargs)
+        self._dispose(key[0], self.backend.set(key, value))
+
+    def invalidate(self, namespace=None):
+        """Drop one namespace, or everything when namespace is None."""
+        for ns in (self.namespaces if namespace is None else [namespace]):
+            self._dispose(ns, self.backend.delete_namespace(ns))
+        if namespace is None:
+            self.backend.clear()
+
+    @property
+    def namespaces(self):
+        return sorted(self._namespaces)
+
+
+# Shared by every session in this process (modules are imported once).
+resources = ResourceCache()
@@ -0,0 +1,192 @@
+"""
+Columnar product catalog built from product_info_skincare.csv.
+
+The CSV is parsed once into flat NumPy columns (one entry per product row) with
+categorical brand/category codes, so the dashboard filters with vectorized
+masks instead of walking Python dicts on every Streamlit rerun. Parsing uses the
+csv module, so a cold start never imports pandas.
+"""
+
+import csv
+import hashlib
+
+import numpy as np
+
+SKIN_TYPES = ["Oily", "Dry", "Combination", "Sensitive", "Normal"]
+SKIN_BITS = {name: np.uint8(1 << i) for i, name in enumerate(SKIN_TYPES)}
+
+# Feed prices are in USD, the dashboard shows rupees.
+USD_TO_INR = 83.0
+
+# highlight tag -> skin types the product is marked as suitable for
+HIGHLIGHT_SKIN_TYPES = {
+    "Best for Oily Skin": ("Oily",),
+    "Best for Dry Skin": ("Dry",),
+    "Best for Combination Skin": ("Combination",),
+    "Best for Normal Skin": ("Normal",),
+    "Best for Dry, Combo, Normal Skin": ("Dry", "Combination", "Normal"),
+    "Best for Oily, Combo, Normal Skin": ("Oily", "Combination", "Normal"),
+    "Good for: Redness": ("Sensitive",),
+    "Good for: Oily Scalp": ("Oily",),
+    "Good for: Flaky/Dry Scalp": ("Dry",),
+    "Good for: Dryness": ("Dry",),
+}
+
+CSV_COLUMNS = [
+    "product_id", "product_name", "brand_name", "loves_count", "rating", "reviews",
+    "price_usd", "highlights", "primary_category", "secondary_category", "tertiary_category",
+]
+
+
+class Catalog:
+    """
+    Read-only columnar product table.
+
+    Row i of every column array describes the same product. `brand_code` and
+    `category_code` index into `brand_names` / `category_names`.
+    """
+
+    def __init__(self, columns, brand_names, category_names, digest=None):
+        self.product_id = columns["product_id"]
+        self.name = columns["name"]
+        self.brand_code = columns["brand_code"]
+        self.category_code = columns["category_code"]
+        self.subcategory = columns["subcategory"]
+        self.price = columns["price"]
+        self.rating = columns["rating"]
+        self.loves = columns["loves"]
+        self.reviews = columns["reviews"]
+        self.skin_mask = columns["skin_mask"]
+        self.brand_names = brand_names
+        self.category_names = category_names
+        self.digest = digest
+        self._brand_index = {b: i for i, b in enumerate(brand_names)}
+
+    def __len__(self):
+        return len(self.product_id)
+
+    def brand_codes(self, names):
+        """Codes for the given brand names; unknown names are dropped."""
+        return np.array([self._brand_index[b] for b in names if b in self._brand_index], dtype=np.int32)
+
+    def filter(self, brands=None, skin_type=None, price_min=None, price_max=None, mask=None):
+        """
+        Row indices matching brand set x skin type x price range.
+
+        Any criterion left as None is not applied; `mask` is an extra boolean
+        row mask (e.g. from the ingredient index). Returns a sorted int array.
+        """
+        return np.flatnonzero(self.filter_mask(brands, skin_type, price_min, price_max, mask))
+
+    def filter_mask(self, brands=None, skin_type=None, price_min=None, price_max=None, mask=None):
+        """Boolean row mask for the same criteria as `filter`."""
+        mask = np.ones(len(self), dtype=bool) if mask is None else mask.copy()
+        if brands is not None:
+            lut = np.zeros(len(self.brand_names), dtype=bool)
+            lut[self.brand_codes(brands)] = True
+            mask &= lut[self.brand_code]
+        if skin_type is not None:
+            mask &= (self.skin_mask & SKIN_BITS[skin_type]) != 0
+        if price_min is not None:
+            mask &= self.price >= price_min
+        if price_max is not None:
+            mask &= self.price <= price_max
+        return mask
+
+    def brands_of(self, rows):
+        """Sorted distinct brand names among the given rows."""
+        return [self.brand_names[c] for c in np.unique(self.brand_code[rows])]
+
+    def skin_types_of(self, row):
+        bits = self.skin_mask[row]
+        return [s for s in SKIN_TYPES if bits & SKIN_BITS[s]]
+
+    def row(self, i):
+        """Plain-dict view of one product, for rendering."""
+        return {
+            "product_id": self.product_id[i],
+            "name": self.name[i],
+            "brand": self.brand_names[self.brand_code[i]],
+            "category": self.category_names[self.category_code[i]],
+            "subcategory": self.subcategory[i],
+            "price": float(self.price[i]),
+            "rating": float(self.rating[i]),
+            "loves": int(self.loves[i]),
+            "reviews": int(self.reviews[i]),
+            "skin_types": self.skin_types_of(i),
+        }
+
+
+def file_digest(path):
+    """SHA-1 of a file's contents, used to key on-disk caches derived from the CSV."""
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha1").hexdigest()
+
+
+def read_csv_columns(path, names):
+    """{name: list of str} for the named CSV columns; empty cells are ""."""
+    limit = csv.field_size_limit()
+    csv.field_size_limit(max(limit, 1 << 24))  # ingredient lists run past the 128 KiB default
+    try:
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            missing = [n for n in names if n not in header]
+            if missing:
+                raise ValueError(f"{path} has no column(s) {', '.join(missing)}")
+            picks = [header.index(n) for n in names]
+            columns = {n: [] for n in names}
+            appends = [columns[n].append for n in names]
+            for row in reader:
+                for i, append in zip(picks, appends):
+                    append(row[i] if i < len(row) else "")
+    finally:
+        csv.field_size_limit(limit)
+    return columns
+
+
+def _numbers(values, dtype):
+    """Numeric column from CSV text; empty cells are 0."""
+    return np.array([float(v) if v else 0.0 for v in values], dtype=np.float64).astype(dtype)
+
+
+def _codes(values, default):
+    """(int codes, sorted category names) for a text column; empty cells become `default`."""
+    values = [v or default for v in values]
+    names = sorted(set(values))
+    index = {v: i for i, v in enumerate(names)}
+    return np.array([index[v] for v in values], dtype=np.int64), names
+
+
+def _skin_masks(highlights):
+    """uint8 skin-type bitmask per row from the stringified highlights lists."""
+    mask = np.zeros(len(highlights), dtype=np.uint8)
+    for tag, skins in HIGHLIGHT_SKIN_TYPES.items():
+        bits = np.uint8(0)
+        for s in skins:
+            bits |= SKIN_BITS[s]
+        hit = np.array([tag in h for h in highlights], dtype=bool)
+        mask[hit] |= bits
+    return mask
+
+
+def load_catalog(path):
+    """Parse the product CSV into a Catalog."""
+    df = read_csv_columns(path, CSV_COLUMNS)
+    brand_code, brand_names = _codes(df["brand_name"], "Unknown")
+    category_code, category_names = _codes(df["primary_category"], "Other")
+    subcategory = [t or s for t, s in zip(df["tertiary_category"], df["secondary_category"])]
+
+    columns = {
+        "product_id": np.array(df["product_id"], dtype=object),
+        "name": np.array(df["product_name"], dtype=object),
+        "brand_code": brand_code.astype(np.int32),
+        "category_code": category_code.astype(np.int16),
+        "subcategory": np.array(subcategory, dtype=object),
+        "price": (_numbers(df["price_usd"], np.float64) * USD_TO_INR).astype(np.float32),
+        "rating": _numbers(df["rating"], np.float32),
+        "loves": _numbers(df["loves_count"], np.int64),
+        "reviews": _numbers(df["reviews"], np.int32),
+        "skin_mask": _skin_masks(df["highlights"]),
+    }
+    return Catalog(columns, brand_names, category_names, file_digest(path))
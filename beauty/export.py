@@ -0,0 +1,203 @@
+"""
+Streaming export of saved interactions.
+
+Records are read from an interaction source (InteractionDB, InteractionLog or
+FirestoreMirror, anything with `iter_records`) in fixed-size chunks, filtered
+by date range and brand, and encoded chunk by chunk as CSV, gzipped CSV or
+Parquet row groups. Sources with `query_chunks` (InteractionDB) filter through
+their indexes instead of a scan. Only one chunk is held in memory at a time,
+however long the history is. The dashboard serves downloads from Streamlit's
+in-memory media store, so it exports in parts of at most EXPORT_PART_RECORDS.
+
+    python -m beauty.export --format csv.gz --since 2025-01-01 --brand CLINIQUE -o clicks.csv.gz
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import os
+import sys
+import tempfile
+from datetime import datetime, time as dtime, timedelta, timezone
+
+from beauty.aggregates import record_epoch
+
+EXPORT_COLUMNS = ("timestamp", "brand", "product_name", "skin_type", "price_range", "price_value")
+# format -> (file name, MIME type)
+FORMATS = {
+    "csv": ("saved_interactions.csv", "text/csv"),
+    "csv.gz": ("saved_interactions.csv.gz", "application/gzip"),
+    "parquet": ("saved_interactions.parquet", "application/vnd.apache.parquet"),
+}
+CHUNK_RECORDS = 5000
+EXPORT_PART_RECORDS = 100_000  # records per dashboard download
+
+
+def _day_start(day):
+    return datetime.combine(day, dtime.min, tzinfo=timezone.utc).timestamp()
+
+
+def date_bounds(since=None, until=None):
+    """Epoch-second bounds [lo, hi) for inclusive datetime.date bounds (UTC days); None where open."""
+    lo = _day_start(since) if since else None
+    hi = _day_start(until + timedelta(days=1)) if until else None
+    return lo, hi
+
+
+def _window(chunks, offset, limit):
+    """Skip the first `offset` records of `chunks` and stop after `limit` (None: no limit)."""
+    for chunk in chunks:
+        if offset:
+            skipped = min(offset, len(chunk))
+            chunk, offset = chunk[skipped:], offset - skipped
+        if limit is not None:
+            chunk, limit = chunk[:limit], limit - min(limit, len(chunk))
+        if chunk:
+            yield chunk
+        if limit == 0:
+            return
+
+
+def filtered_chunks(source, since=None, until=None, brands=None, chunk_records=CHUNK_RECORDS,
+                    offset=0, limit=None):
+    """
+    Yield non-empty lists of records from `source` matching the filters.
+
+    since / until: inclusive datetime.date bounds (UTC days). brands: iterable
+    of brand names, or None for all. Records without a parseable timestamp are
+    dropped when a date bound is given. offset / limit select a window of the
+    matching records.
+    """
+    lo, hi = date_bounds(since, until)
+    brands = set(brands) if brands else None
+    if hasattr(source, "query_chunks"):
+        yield from source.query_chunks(lo, hi, brands, chunk_records, offset, limit)
+        return
+    yield from _window(_scan(source, lo, hi, brands, chunk_records), offset, limit)
+
+
+def _scan(source, lo, hi, brands, chunk_records):
+    for chunk in source.iter_records(chunk_records):
+        if brands is not None:
+            chunk = [r for r in chunk if r.get("brand") in brands]
+        if lo is not None or hi is not None:
+            kept = []
+            for r in chunk:
+                t = record_epoch(r)
+                if t is not None and (lo is None or t >= lo) and (hi is None or t < hi):
+                    kept.append(r)
+            chunk = kept
+        if chunk:
+            yield chunk
+
+
+def iter_csv(chunks):
+    """Encode record chunks as UTF-8 CSV, yielding one bytes block per chunk (header first)."""
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, EXPORT_COLUMNS, extrasaction="ignore", lineterminator="\n")
+    writer.writeheader()
+    yield buf.getvalue().encode("utf-8")
+    for chunk in chunks:
+        buf.seek(0)
+        buf.truncate()
+        writer.writerows(chunk)
+        yield buf.getvalue().encode("utf-8")
+
+
+def _write_parquet(chunks, fileobj):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("timestamp", pa.timestamp("us", tz="UTC")),
+        ("brand", pa.string()),
+        ("product_name", pa.string()),
+        ("skin_type", pa.string()),
+        ("price_range", pa.string()),
+        ("price_value", pa.float64()),
+    ])
+    with pq.ParquetWriter(fileobj, schema) as writer:  # one row group per chunk
+        for chunk in chunks:
+            ts = [record_epoch(r) for r in chunk]
+            columns = [pa.array([None if t is None else int(t * 1_000_000) for t in ts], pa.int64()).cast(schema[0].type)]
+            for name in EXPORT_COLUMNS[1:]:
+                columns.append(pa.array([r.get(name) for r in chunk], schema.field(name).type))
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+
+
+def write_export(source, fileobj, fmt="csv", since=None, until=None, brands=None, chunk_records=CHUNK_RECORDS,
+                 offset=0, limit=None):
+    """Stream the filtered records of `source` into a binary file object. Returns the row count."""
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown export format {fmt!r}; expected one of {', '.join(FORMATS)}")
+    rows = 0
+
+    def counted():
+        nonlocal rows
+        for chunk in filtered_chunks(source, since, until, brands, chunk_records, offset, limit):
+            rows += len(chunk)
+            yield chunk
+
+    if fmt == "parquet":
+        _write_parquet(counted(), fileobj)
+        return rows
+    out = gzip.GzipFile(fileobj=fileobj, mode="wb", mtime=0) if fmt == "csv.gz" else fileobj
+    for block in iter_csv(counted()):
+        out.write(block)
+    if out is not fileobj:
+        out.close()
+    return rows
+
+
+def export_part(source, fmt="csv", since=None, until=None, brands=None, part=0,
+                part_records=EXPORT_PART_RECORDS, directory=None):
+    """
+    Bytes of the `part`-th block of part_records matching records (oldest first).
+
+    Encoded through an anonymous temporary file, so only one chunk of records
+    is in memory while the part is written; the returned bytes are what
+    st.download_button keeps, and part_records bounds them.
+    """
+    with tempfile.TemporaryFile(dir=directory) as f:
+        write_export(source, f, fmt, since, until, brands, offset=part * part_records, limit=part_records)
+        f.seek(0)
+        return f.read()
+
+
+def part_count(matching, part_records=EXPORT_PART_RECORDS):
+    """Number of downloads needed for `matching` records (at least one)."""
+    return max(1, -(-matching // part_records))
+
+
+def part_file_name(file_name, part, parts):
+    """saved_interactions.csv -> saved_interactions.part2.csv when there is more than one part."""
+    if parts <= 1:
+        return file_name
+    stem, _, ext = file_name.partition(".")
+    return f"{stem}.part{part + 1}.{ext}"
+
+
+def main(argv=None):
+    from beauty.interaction_db import InteractionDB
+
+    parser = argparse.ArgumentParser(description="Export saved interactions from the local store.")
+    parser.add_argument("--data-dir", default=os.environ.get("BEAUTY_DATA_DIR", "beauty_data"))
+    parser.add_argument("--format", choices=list(FORMATS), default="csv")
+    parser.add_argument("--since", type=lambda s: datetime.strptime(s, "%Y-%m-%d").date())
+    parser.add_argument("--until", type=lambda s: datetime.strptime(s, "%Y-%m-%d").date())
+    parser.add_argument("--brand", action="append", help="repeat to export several brands")
+    parser.add_argument("-o", "--output", default="-", help="output file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    store = InteractionDB(os.path.join(args.data_dir, "interactions.sqlite"))
+    if args.output == "-":
+        rows = write_export(store, sys.stdout.buffer, args.format, args.since, args.until, args.brand)
+    else:
+        with open(args.output, "wb") as f:
+            rows = write_export(store, f, args.format, args.since, args.until, args.brand)
+    print(f"Exported {rows} records.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
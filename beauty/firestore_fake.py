@@ -0,0 +1,169 @@
+"""
+In-memory stand-in for the slice of the google-cloud-firestore client the
+dashboard uses (collection/document/set, ordered queries with cursors and
+limits, write batches). It counts document reads and batch commits so sync and
+write paths can be checked without network access. For end-to-end checks use
+the real client against the Firestore emulator (set FIRESTORE_EMULATOR_HOST).
+"""
+
+import itertools
+import threading
+from datetime import datetime, timezone
+
+SERVER_TIMESTAMP = object()
+
+
+def _is_server_timestamp(value):
+    # Accept both our sentinel and google.cloud.firestore's SERVER_TIMESTAMP.
+    return value is SERVER_TIMESTAMP or type(value).__name__ == "Sentinel"
+
+
+class FakeSnapshot:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+    def get(self, field):
+        return self._data.get(field)
+
+
+class FakeDocument:
+    def __init__(self, client, collection, doc_id):
+        self._client = client
+        self._collection = collection
+        self.id = doc_id
+
+    def set(self, data):
+        self._client._write(self._collection, self.id, data)
+
+
+class FakeQuery:
+    DESCENDING = "DESCENDING"
+    ASCENDING = "ASCENDING"
+
+    def __init__(self, client, collection, orders=(), start=None, limit_=None):
+        self._client = client
+        self._collection = collection
+        self._orders = list(orders)
+        self._start = start  # (values, inclusive)
+        self._limit = limit_
+
+    def _copy(self, **kw):
+        q = FakeQuery(self._client, self._collection, self._orders, self._start, self._limit)
+        for k, v in kw.items():
+            setattr(q, k, v)
+        return q
+
+    def order_by(self, field, direction=None):
+        return self._copy(_orders=self._orders + [(field, direction or self.ASCENDING)])
+
+    def limit(self, n):
+        return self._copy(_limit=n)
+
+    def start_at(self, values):
+        return self._copy(_start=(values, True))
+
+    def start_after(self, values):
+        return self._copy(_start=(values, False))
+
+    def _key(self, doc_id, data):
+        # Like Firestore, ties are broken by document id ("__name__" orders by it explicitly).
+        return tuple(doc_id if f == "__name__" else data.get(f) for f, _ in self._orders) + (doc_id,)
+
+    def _cursor_key(self, values):
+        if isinstance(values, FakeSnapshot):
+            return self._key(values.id, values._data), True
+        # Like Firestore, a cursor may give values for only the leading order_by fields.
+        fields = [f for f, _ in self._orders]
+        n = next((i for i, f in enumerate(fields) if f not in values), len(fields))
+        return tuple(values[f] for f in fields[:n]), False
+
+    def stream(self):
+        with self._client._lock:
+            docs = [(i, dict(d)) for i, d in self._client._collections.get(self._collection, {}).items()]
+        fields = [f for f, _ in self._orders if f != "__name__"]
+        docs = [(i, d) for i, d in docs if all(d.get(f) is not None for f in fields)]
+        reverse = bool(self._orders) and self._orders[0][1] == self.DESCENDING
+        docs.sort(key=lambda x: self._key(*x), reverse=reverse)
+        if self._start is not None:
+            values, inclusive = self._start
+            ckey, full = self._cursor_key(values)
+            n = len(ckey)
+
+            def after(doc):
+                k = self._key(*doc)[:n] if not full else self._key(*doc)
+                if reverse:
+                    return k < ckey or (inclusive and k == ckey)
+                return k > ckey or (inclusive and k == ckey)
+            docs = [d for d in docs if after(d)]
+        if self._limit is not None:
+            docs = docs[:self._limit]
+        self._client.reads += max(1, len(docs))  # Firestore bills one read for an empty result
+        return iter([FakeSnapshot(i, d) for i, d in docs])
+
+
+class FakeCollection(FakeQuery):
+    def __init__(self, client, name):
+        super().__init__(client, name)
+
+    def document(self, doc_id=None):
+        return FakeDocument(self._client, self._collection, doc_id or self._client._new_id())
+
+
+class FakeBatch:
+    def __init__(self, client):
+        self._client = client
+        self._writes = []
+
+    def set(self, doc_ref, data):
+        self._writes.append((doc_ref._collection, doc_ref.id, data))
+
+    def commit(self):
+        self._client._commit(self._writes)
+        self._writes = []
+
+
+class FakeFirestore:
+    """
+    Minimal Firestore client. `fail_commits` > 0 makes that many upcoming
+    writes/commits raise, to exercise retry and spill paths. Generated document
+    ids are `id_prefix` plus a counter; give clients sharing one mirror distinct
+    prefixes.
+    """
+
+    def __init__(self, id_prefix="doc"):
+        self._collections = {}
+        self._lock = threading.Lock()
+        self._id_prefix = id_prefix
+        self._ids = itertools.count(1)
+        self.reads = 0
+        self.writes = 0
+        self.commits = 0
+        self.fail_commits = 0
+
+    def _new_id(self):
+        return f"{self._id_prefix}{next(self._ids):012d}"
+
+    def collection(self, name):
+        return FakeCollection(self, name)
+
+    def batch(self):
+        return FakeBatch(self)
+
+    def _write(self, collection, doc_id, data):
+        self._commit([(collection, doc_id, data)])
+
+    def _commit(self, writes):
+        with self._lock:
+            if self.fail_commits > 0:
+                self.fail_commits -= 1
+                raise ConnectionError("fake Firestore unavailable")
+            now = datetime.now(timezone.utc)
+            for collection, doc_id, data in writes:
+                data = {k: (now if _is_server_timestamp(v) else v) for k, v in data.items()}
+                self._collections.setdefault(collection, {})[doc_id] = data
+            self.writes += len(writes)
+            self.commits += 1
@@ -0,0 +1,159 @@
+"""
+Local SQLite mirror of the Firestore product_clicks collection.
+
+Each sync pulls only documents after the last mirrored (timestamp, document
+id) pair, ordering by both so documents sharing one server timestamp are never
+read twice; Firestore reads scale with new events rather than with page views. Analytics then run over the
+full mirrored history through `read_since`, the same cursor interface the
+local interaction log exposes.
+"""
+
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+from beauty.aggregates import record_epoch
+from beauty.records import RECORD_FIELDS, CursorSource
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS clicks (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    doc_id TEXT NOT NULL UNIQUE,
+    brand TEXT,
+    product_name TEXT,
+    skin_type TEXT,
+    price_range TEXT,
+    price_value REAL,
+    ts REAL
+);
+CREATE INDEX IF NOT EXISTS clicks_ts ON clicks (ts);
+CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value);
+"""
+
+
+def _iso(epoch):
+    return datetime.fromtimestamp(epoch, timezone.utc).replace(tzinfo=None).isoformat() if epoch is not None else None
+
+
+class FirestoreMirror(CursorSource):
+    """
+    SQLite copy of one Firestore collection.
+
+    db: a firestore client (or FakeFirestore). min_interval: seconds between
+    remote syncs; calls in between are answered from the cache alone.
+    """
+
+    def __init__(self, db, path, collection="product_clicks", page_size=500, min_interval=10.0):
+        self.db = db
+        self.path = path
+        self.collection = collection
+        self.page_size = page_size
+        self.min_interval = min_interval
+        self._lock = threading.Lock()  # guards the SQLite connection
+        self._sync_lock = threading.Lock()  # one remote sync at a time
+        self._last_sync = None
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def _state(self, key, default=None):
+        row = self._conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    @property
+    def last_synced_ts(self):
+        with self._lock:
+            return self._state("last_ts")
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM clicks").fetchone()[0]
+
+    def sync(self, force=False):
+        """
+        Pull documents newer than the mirror's high-water mark. Returns how many were new.
+
+        One sync runs at a time; a concurrent call returns 0 at once unless
+        forced, in which case it waits. Pages are fetched without holding the
+        connection lock, which is only taken to merge each page and advance the
+        cursor, so readers never wait on the network.
+        """
+        if not self._sync_lock.acquire(blocking=force):
+            return 0
+        try:
+            with self._lock:
+                now = time.monotonic()
+                if not force and self._last_sync is not None and now - self._last_sync < self.min_interval:
+                    return 0
+                self._last_sync = now
+                last_ts, last_id = self._state("last_ts"), self._state("last_id")
+
+            ordered = self.db.collection(self.collection).order_by("timestamp").order_by("__name__")
+            query = ordered
+            if last_ts is not None and last_id is not None:
+                query = ordered.start_after({"timestamp": datetime.fromisoformat(last_ts), "__name__": last_id})
+            elif last_ts is not None:  # state from before the id was kept: re-read that one timestamp
+                query = ordered.start_at({"timestamp": datetime.fromisoformat(last_ts)})
+
+            added = 0
+            while True:
+                docs = list(query.limit(self.page_size).stream())
+                rows = []
+                for d in docs:
+                    r = d.to_dict()
+                    # Replayed write-behind records are stamped at commit; analytics use the click time.
+                    clicked = {"timestamp": r.get("client_timestamp") or r.get("timestamp")}
+                    rows.append((d.id,) + tuple(r.get(f) for f in RECORD_FIELDS) + (record_epoch(clicked),))
+                newest = docs[-1].to_dict().get("timestamp") if docs else None
+                with self._lock:
+                    cur = self._conn.executemany(
+                        "INSERT OR IGNORE INTO clicks (doc_id, brand, product_name, skin_type, price_range, price_value, ts) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        rows,
+                    )
+                    added += cur.rowcount
+                    if isinstance(newest, datetime):
+                        # Stored as ISO text to keep the exact (microsecond) cursor value.
+                        self._conn.executemany(
+                            "INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)",
+                            [("last_ts", newest.isoformat()), ("last_id", docs[-1].id)],
+                        )
+                    self._conn.commit()
+                if len(docs) < self.page_size:
+                    break
+                query = ordered.start_after(docs[-1])
+            return added
+        finally:
+            self._sync_lock.release()
+
+    def _rows_since(self, cursor, max_records):
+        sql = ("SELECT seq, brand, product_name, skin_type, price_range, price_value, ts "
+               "FROM clicks WHERE seq > ? ORDER BY seq")
+        params = [cursor]
+        if max_records is not None:
+            sql += " LIMIT ?"
+            params.append(max_records)
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def read_since(self, cursor=0, max_records=None):
+        """Mirrored records with seq > cursor, as (records, new_cursor)."""
+        rows = self._rows_since(cursor, max_records)
+        records = [
+            dict(zip(RECORD_FIELDS, row[1:6]), timestamp=_iso(row[6]))
+            for row in rows
+        ]
+        return records, (rows[-1][0] if rows else cursor)
+
+    def read_columns_since(self, cursor=0, max_records=None):
+        """The same rows as read_since, as ({field: tuple}, new_cursor) with epoch seconds under "ts"."""
+        names = ("seq",) + RECORD_FIELDS + ("ts",)
+        rows = self._rows_since(cursor, max_records)
+        columns = dict(zip(names, zip(*rows))) if rows else {c: () for c in names}
+        del columns["seq"]
+        return columns, (rows[-1][0] if rows else cursor)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,46 @@
+"""
+Vectorized exponential-smoothing forecasts.
+
+Holt's linear method (level + damped trend) is fitted to every series of a
+(series x time) count matrix at once: each smoothing step is one NumPy
+operation across all series and all candidate parameter pairs, and the pair
+with the lowest one-step-ahead squared error is kept per series.
+"""
+
+import numpy as np
+
+ALPHAS = (0.1, 0.3, 0.5, 0.8)
+BETAS = (0.0, 0.1, 0.3)
+DAMPING = 0.9
+
+
+def holt_forecast(y, horizon, alphas=ALPHAS, betas=BETAS, phi=DAMPING):
+    """
+    Forecast the next `horizon` values of each row of `y` (n_series x n_steps).
+
+    Returns (forecast, params): forecast is float64 (n_series x horizon),
+    clipped at zero; params is (n_series x 2) with the chosen (alpha, beta).
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n, t = y.shape
+    if n == 0 or t == 0:
+        return np.zeros((n, horizon)), np.zeros((n, 2))
+    a, b = (g.reshape(-1, 1) for g in np.meshgrid(alphas, betas, indexing="ij"))
+    grid = np.hstack([a, b])  # (G, 2)
+    alpha, beta = grid[:, :1], grid[:, 1:]  # broadcast against (G, n)
+    level = np.broadcast_to(y[:, 0], (len(grid), n)).copy()
+    trend = np.zeros_like(level)
+    sse = np.zeros_like(level)
+    for step in range(1, t):
+        predicted = level + phi * trend
+        err = y[:, step] - predicted
+        sse += err * err
+        new_level = predicted + alpha * err
+        trend = phi * trend + beta * (new_level - level - phi * trend)
+        level = new_level
+    best = np.argmin(sse, axis=0)  # per series
+    cols = np.arange(n)
+    level, trend = level[best, cols], trend[best, cols]
+    damp = np.cumsum(phi ** np.arange(1, horizon + 1))  # phi + phi^2 + ... per horizon step
+    forecast = level[:, None] + trend[:, None] * damp[None, :]
+    return np.maximum(forecast, 0), grid[best]
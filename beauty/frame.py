@@ -0,0 +1,182 @@
+"""
+Compact columnar store of saved interactions.
+
+Records are folded straight into dictionary-encoded columns (int codes plus
+one list of distinct values per field), an int64 microsecond timestamp and a
+float32 price, so a million interactions take roughly 25 MB instead of the
+hundreds of MB of a list of dicts / object-dtype DataFrame. Sources with
+`read_columns_since` (the SQLite store and the Firestore mirror) hand over
+column tuples and stored epoch seconds, so no dict or timestamp parse happens
+per record. Like AggregateStore, the frame follows its source by cursor and is
+built once per process; sessions read immutable snapshots of it.
+"""
+
+import threading
+
+import numpy as np
+
+from beauty.aggregates import record_epoch
+
+CATEGORICAL_FIELDS = ("brand", "product_name", "skin_type", "price_range")
+NAT = np.iinfo(np.int64).min  # missing timestamp, as pandas' NaT
+
+
+class _Dictionary:
+    """value -> code mapping for one categorical column (None is code -1)."""
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def encode(self, values):
+        codes, out = self.codes, []
+        for v in values:
+            if v is None:
+                out.append(-1)
+                continue
+            c = codes.get(v)
+            if c is None:
+                c = codes[v] = len(self.values)
+                self.values.append(v)
+            out.append(c)
+        return out
+
+
+class FrameSnapshot:
+    """Read-only view of the first `n` rows of an InteractionFrame."""
+
+    def __init__(self, n, columns, categories):
+        self.n = n
+        self.columns = columns
+        self.categories = categories
+
+    def __len__(self):
+        return self.n
+
+    def decode(self, field, rows):
+        """Values of a categorical field for the given row indices."""
+        values = self.categories[field]
+        return [values[c] if c >= 0 else None for c in self.columns[field][rows]]
+
+    def to_pandas(self, rows=None):
+        """
+        DataFrame with Categorical columns (sharing the code arrays for a full
+        snapshot) and a UTC datetime timestamp; `rows` selects a subset.
+        """
+        import pandas as pd
+
+        pick = (lambda a: a) if rows is None else (lambda a: a[rows])
+        data = {}
+        ts = pick(self.columns["timestamp"])
+        data["timestamp"] = pd.to_datetime(ts.view("datetime64[us]"), utc=True)  # NAT is numpy's NaT
+        for f in CATEGORICAL_FIELDS:
+            data[f] = pd.Categorical.from_codes(pick(self.columns[f]), categories=self.categories[f], validate=False)
+        data["price_value"] = pick(self.columns["price_value"])
+        return pd.DataFrame(data)
+
+    def tail(self, n=100):
+        """The last n rows, newest first, as a DataFrame."""
+        return self.to_pandas(np.arange(self.n - 1, max(self.n - n, 0) - 1, -1))
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in self.columns.values())
+
+
+class InteractionFrame:
+    """Growable dictionary-encoded columns over an interaction source."""
+
+    def __init__(self, capacity=1024, chunk_records=50_000):
+        self.chunk_records = chunk_records
+        self.n = 0
+        self.cursor = 0
+        self.version = 0
+        self._dicts = {f: _Dictionary() for f in CATEGORICAL_FIELDS}
+        self._columns = self._allocate(capacity)
+        self._lock = threading.Lock()
+        self._snapshot = None
+
+    @staticmethod
+    def _allocate(capacity):
+        cols = {f: np.empty(capacity, dtype=np.int32) for f in CATEGORICAL_FIELDS}
+        cols["timestamp"] = np.empty(capacity, dtype=np.int64)
+        cols["price_value"] = np.empty(capacity, dtype=np.float32)
+        return cols
+
+    def _reserve(self, extra):
+        capacity = len(self._columns["timestamp"])
+        if self.n + extra <= capacity:
+            return
+        while capacity < self.n + extra:
+            capacity *= 2
+        grown = self._allocate(capacity)
+        for name, col in self._columns.items():
+            grown[name][:self.n] = col[:self.n]
+        # Earlier snapshots keep viewing the old arrays, which stay valid.
+        self._columns = grown
+
+    def _apply(self, records):
+        columns = {f: [r.get(f) for r in records] for f in CATEGORICAL_FIELDS + ("price_value",)}
+        columns["ts"] = [record_epoch(r) for r in records]
+        self._apply_columns(columns)
+
+    def _apply_columns(self, columns):
+        """Append {field: sequence} with epoch seconds (or None) under "ts"."""
+        k = len(columns["ts"])
+        if not k:
+            return
+        self._reserve(k)
+        lo, hi = self.n, self.n + k
+        for f in CATEGORICAL_FIELDS:
+            self._columns[f][lo:hi] = self._dicts[f].encode(columns[f])
+        epochs = np.array(columns["ts"], dtype=np.float64)  # None -> nan
+        stamped = ~np.isnan(epochs)
+        micros = np.full(k, NAT, dtype=np.int64)
+        micros[stamped] = (epochs[stamped] * 1_000_000).astype(np.int64)
+        self._columns["timestamp"][lo:hi] = micros
+        try:
+            self._columns["price_value"][lo:hi] = np.array(columns["price_value"], dtype=np.float64)
+        except (TypeError, ValueError):  # a stray non-numeric price
+            self._columns["price_value"][lo:hi] = [_price(v) for v in columns["price_value"]]
+        self.n = hi
+        self.version += 1
+
+    def catch_up(self, source):
+        """Append everything past our cursor, chunk by chunk. Returns the number of new records."""
+        read_columns = getattr(source, "read_columns_since", None)
+        added = 0
+        with self._lock:
+            while True:
+                if read_columns is not None:
+                    columns, cursor = read_columns(self.cursor, max_records=self.chunk_records)
+                    k = len(columns["ts"])
+                    self._apply_columns(columns)
+                else:
+                    records, cursor = source.read_since(self.cursor, max_records=self.chunk_records)
+                    k = len(records)
+                    self._apply(records)
+                self.cursor = cursor
+                added += k
+                if k < self.chunk_records:
+                    return added
+
+    def snapshot(self):
+        """Immutable view of the rows so far; cached until the next append."""
+        with self._lock:
+            snap = self._snapshot
+            if snap is None or snap.n != self.n:
+                columns = {}
+                for name, col in self._columns.items():
+                    view = col[:self.n]
+                    view.flags.writeable = False
+                    columns[name] = view
+                categories = {f: tuple(d.values) for f, d in self._dicts.items()}
+                snap = self._snapshot = FrameSnapshot(self.n, columns, categories)
+            return snap
+
+
+def _price(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
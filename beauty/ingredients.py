@@ -0,0 +1,273 @@
+"""
+Inverted ingredient index over the catalog's `ingredients` column.
+
+Ingredient lists are tokenized into INCI names, normalized (case, percentages,
+"Water (Aqua)" / "Aqua/Water" aliases) and indexed term -> product rows. Known
+synonyms (Latin, French and colour-index names, see ALIASES) are folded into
+one canonical term when indexing and querying, so "aqua" finds every product
+listing water under either name. Common
+terms are stored as packed bitmaps, rare ones as sorted posting lists; both
+are saved as .npy files and memory-mapped on load. Queries such as "contains
+niacinamide, excludes fragrance" resolve to bitmap AND / AND-NOT operations,
+never to substring scans over the products.
+"""
+
+import ast
+import json
+import os
+import re
+import shutil
+from functools import lru_cache
+
+import numpy as np
+
+from beauty.catalog import read_csv_columns
+
+_SPLIT_OUTSIDE_PARENS = re.compile(r",\s*(?![^()]*\))")
+_PARENS = re.compile(r"\(([^()]*)\)")
+_PERCENT = re.compile(r"\b\d+(?:[.,]\d+)?\s*%")
+_CODES = re.compile(r"<[^>]*>|\[[^\]]*\]")  # supplier codes such as <ILN35606> or [V3545A]
+_SPACES = re.compile(r"\s+")
+_MAX_WORDS = 8
+# A term present in at least 1/DENSE_RATIO of the products is kept as a bitmap.
+DENSE_RATIO = 64
+# Bumped whenever normalization changes, so cached indexes are rebuilt.
+INDEX_VERSION = 2
+
+# canonical term -> other names products list it under
+ALIASES = {
+    "water": ("aqua", "eau"),
+    "fragrance": ("parfum", "perfume"),
+    "glycerin": ("glycerine", "glycerol"),
+    "honey": ("mel", "miel"),
+    "beeswax": ("cera alba", "cire d'abeille"),
+    "panthenol": ("pro-vitamin b5", "provitamin b5", "pro vitamin b5"),
+    "yeast extract": ("faex",),
+    "sea salt": ("maris sal",),
+    "butyrospermum parkii butter": ("shea butter", "butyrospermum parkii"),
+    "helianthus annuus seed oil": ("sunflower seed oil",),
+    "cocos nucifera oil": ("coconut oil",),
+    "simmondsia chinensis seed oil": ("jojoba seed oil", "jojoba oil"),
+    "olea europaea fruit oil": ("olive fruit oil", "olive oil"),
+    "prunus amygdalus dulcis oil": ("sweet almond oil",),
+    "argania spinosa kernel oil": ("argan kernel oil", "argan oil"),
+    "persea gratissima oil": ("avocado oil",),
+    "ricinus communis seed oil": ("castor seed oil", "castor oil"),
+    "aloe barbadensis leaf juice": ("aloe vera leaf juice",),
+    "rosmarinus officinalis leaf extract": ("rosemary leaf extract",),
+    "camellia sinensis leaf extract": ("green tea leaf extract",),
+    "titanium dioxide": ("ci 77891",),
+    "iron oxides": ("iron oxide", "ci 77491", "ci 77492", "ci 77499"),
+    "mica": ("ci 77019",),
+    "zinc oxide": ("ci 77947",),
+    "ultramarines": ("ci 77007",),
+    "manganese violet": ("ci 77742",),
+    "bismuth oxychloride": ("ci 77163",),
+    "chromium oxide greens": ("ci 77288",),
+    "carmine": ("ci 75470",),
+    "yellow 5": ("ci 19140", "fd&c yellow no. 5"),
+    "yellow 6": ("ci 15985",),
+    "red 4": ("ci 14700",),
+    "red 33": ("ci 17200",),
+    "blue 1": ("ci 42090",),
+}
+_CANONICAL = {alias: name for name, aliases in ALIASES.items() for alias in aliases}
+_COLOUR_INDEX = re.compile(r"\bc\.?\s?[il]\.?\s?(\d{5})\b")  # "CI77891", "C.I. 77891", "Cl 77891"
+
+
+def _clean(name):
+    name = _CODES.sub("", _PERCENT.sub("", name.lower()))
+    name = name.strip(" \t.;*-•†")
+    return _SPACES.sub(" ", name)
+
+
+def canonical_ingredient(name):
+    """The indexed term for a cleaned ingredient name (synonyms and colour-index spellings folded)."""
+    name = _COLOUR_INDEX.sub(r"ci \1", name)
+    return _CANONICAL.get(name, name)
+
+
+def normalize_ingredient(raw):
+    """(canonical name, [aliases]) for one raw INCI entry, or None if it is not an ingredient."""
+    if ":" in raw:  # "Ingredients: Water" / "Big Sky:" section headers
+        raw = raw.rsplit(":", 1)[1]
+    aliases = [_clean(a) for a in _PARENS.findall(raw)]
+    base = _clean(_PARENS.sub("", raw))
+    if "/" in base:
+        parts = [_clean(p) for p in base.split("/")]
+        base, aliases = parts[0], aliases + parts[1:]
+    if not base or len(base.split()) > _MAX_WORDS:
+        return None
+    base = canonical_ingredient(base)
+    aliases = {canonical_ingredient(a) for a in aliases if a and len(a.split()) <= _MAX_WORDS}
+    return base, sorted(aliases - {base})
+
+
+def split_ingredients(value):
+    """Raw ingredient entries from the CSV's stringified list (or a plain comma list)."""
+    if not isinstance(value, str) or not value:
+        return []
+    try:
+        chunks = ast.literal_eval(value) if value.startswith("[") else [value]
+    except (ValueError, SyntaxError):
+        chunks = [value.strip("[]")]
+    out = []
+    for chunk in chunks:
+        out.extend(p for p in _SPLIT_OUTSIDE_PARENS.split(str(chunk)) if p.strip())
+    return out
+
+
+def product_terms(value):
+    """Set of normalized terms (canonical names and aliases) for one product."""
+    terms = set()
+    for raw in split_ingredients(value):
+        norm = normalize_ingredient(raw)
+        if norm:
+            terms.add(norm[0])
+            terms.update(norm[1])
+    return terms
+
+
+class IngredientIndex:
+    """
+    term -> product-row bitmap.
+
+    `dense` holds packed bitmaps (np.packbits, little bit order) for common
+    terms; rare terms use `postings[offsets[i]:offsets[i + 1]]`. `slots[t]` is
+    (is_dense, row in dense or sparse id).
+    """
+
+    def __init__(self, n_products, terms, slots, dense, offsets, postings):
+        self.n_products = n_products
+        self.terms = terms
+        self.slots = slots
+        self.dense = dense
+        self.offsets = offsets
+        self.postings = postings
+        self.n_bytes = (n_products + 7) // 8
+        self._words = {t: frozenset(t.split()) for t in terms}
+        self.resolve = lru_cache(maxsize=1024)(self._resolve)
+
+    @property
+    def names(self):
+        """Every name a query can use: the indexed terms plus the ALIASES of indexed ones."""
+        return list(self.terms) + sorted(a for a, t in _CANONICAL.items() if t in self.slots)
+
+    @classmethod
+    def build(cls, ingredient_values):
+        n = len(ingredient_values)
+        rows_by_term = {}
+        seen = {}  # product variants often repeat the same ingredient list verbatim
+        for row, value in enumerate(ingredient_values):
+            terms = seen.get(value)
+            if terms is None:
+                terms = seen[value] = product_terms(value)
+            for t in terms:
+                rows_by_term.setdefault(t, []).append(row)
+        terms = sorted(rows_by_term)
+        threshold = max(1, n // DENSE_RATIO)
+        n_bytes = (n + 7) // 8
+        slots, dense_rows, offsets, postings = {}, [], [0], []
+        for t in terms:
+            rows = rows_by_term[t]
+            if len(rows) >= threshold:
+                bits = np.zeros(n, dtype=bool)
+                bits[rows] = True
+                slots[t] = (True, len(dense_rows))
+                dense_rows.append(np.packbits(bits, bitorder="little"))
+            else:
+                slots[t] = (False, len(offsets) - 1)
+                postings.extend(rows)
+                offsets.append(len(postings))
+        dense = np.vstack(dense_rows) if dense_rows else np.zeros((0, n_bytes), dtype=np.uint8)
+        return cls(n, terms, slots, dense, np.array(offsets, dtype=np.int64), np.array(postings, dtype=np.int32))
+
+    # ---------------- persistence ----------------
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "dense.npy"), self.dense)
+        np.save(os.path.join(directory, "offsets.npy"), self.offsets)
+        np.save(os.path.join(directory, "postings.npy"), self.postings)
+        meta = {"n_products": self.n_products, "terms": self.terms,
+                "slots": [[int(d), int(i)] for d, i in (self.slots[t] for t in self.terms)]}
+        tmp = os.path.join(directory, "meta.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp, os.path.join(directory, "meta.json"))  # written last: marks the index complete
+
+    @classmethod
+    def load(cls, directory):
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        slots = {t: (bool(d), i) for t, (d, i) in zip(meta["terms"], meta["slots"])}
+        arrays = [np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+                  for name in ("dense", "offsets", "postings")]
+        return cls(meta["n_products"], meta["terms"], slots, *arrays)
+
+    # ---------------- queries ----------------
+    def _resolve(self, query):
+        """
+        Terms matching a user-typed ingredient: the exact normalized name if
+        indexed, otherwise every term containing all of its words.
+        """
+        norm = normalize_ingredient(query)
+        if not norm:
+            return ()
+        name = norm[0]
+        if name in self.slots:
+            return (name,)
+        words = set(name.split())
+        return tuple(t for t, w in self._words.items() if words <= w)
+
+    def term_bitmap(self, term):
+        """Packed bitmap of the products listing `term`."""
+        is_dense, i = self.slots[term]
+        if is_dense:
+            return np.asarray(self.dense[i])
+        bits = np.zeros(self.n_bytes * 8, dtype=bool)
+        bits[self.postings[self.offsets[i]:self.offsets[i + 1]]] = True
+        return np.packbits(bits, bitorder="little")
+
+    def query_bitmap(self, query):
+        """Union of the bitmaps of every term `query` resolves to (all zeros if none)."""
+        out = np.zeros(self.n_bytes, dtype=np.uint8)
+        for t in self.resolve(query):
+            np.bitwise_or(out, self.term_bitmap(t), out=out)
+        return out
+
+    def mask(self, contains=(), excludes=()):
+        """
+        Boolean row mask: products listing every `contains` ingredient and none
+        of the `excludes`. Also returns the queries that matched no term.
+        Both resolve the same way, so excluding "water" keeps "rose water".
+        """
+        acc = np.full(self.n_bytes, 0xFF, dtype=np.uint8)
+        unknown = []
+        for q in contains:
+            bm = self.query_bitmap(q)
+            if not self.resolve(q):
+                unknown.append(q)
+            np.bitwise_and(acc, bm, out=acc)
+        for q in excludes:
+            if not self.resolve(q):
+                unknown.append(q)
+                continue
+            np.bitwise_and(acc, np.invert(self.query_bitmap(q)), out=acc)
+        return np.unpackbits(acc, count=self.n_products, bitorder="little").astype(bool), unknown
+
+
+def load_or_build_index(csv_path, cache_dir, digest):
+    """Memory-map the persisted index for this CSV content, building it on first use."""
+    directory = os.path.join(cache_dir, f"ingredients-v{INDEX_VERSION}-{digest[:16]}")
+    if os.path.exists(os.path.join(directory, "meta.json")):
+        return IngredientIndex.load(directory)
+    index = IngredientIndex.build(read_csv_columns(csv_path, ["ingredients"])["ingredients"])
+    # Build in a private directory and rename it into place, so processes
+    # building the same index at once never read each other's partial files.
+    tmp = f"{directory}.{os.getpid()}.tmp"
+    index.save(tmp)
+    try:
+        os.rename(tmp, directory)
+    except OSError:  # another process got there first
+        shutil.rmtree(tmp, ignore_errors=True)
+    return IngredientIndex.load(directory)
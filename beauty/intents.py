@@ -0,0 +1,173 @@
+"""
+Intent and entity extraction for the chatbot, plus its response cache.
+
+Every phrase the bot understands (intent keywords, brand names, skin types,
+categories, ingredient names) is compiled once into a single trie-shaped
+regex, so a query is scanned in one left-to-right pass with longest-match
+semantics instead of a chain of `in` checks per keyword and per brand.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Checked in this order when a query names several intents.
+INTENT_KEYWORDS = {
+    "trend": ("trend", "trends", "trending", "popular", "popularity"),
+    "forecast": ("forecast", "forecasts", "predict", "prediction", "next week"),
+    "recommend": ("recommend", "recommendation", "recommendations", "best", "suggest", "suggestion"),
+    "price": ("price", "prices", "pricing", "cheap", "expensive", "budget", "luxury"),
+}
+_INGREDIENT_TERM = re.compile(r"[a-z][a-z0-9' -]{2,39}")
+# Ingredient names that are also everyday words in questions.
+_GENERIC_TERMS = frozenset({"and", "acid", "ext", "extract", "fruit", "gum", "leaf", "nut", "oil", "plant",
+                            "root", "seed", "stem", "water", "wax"})
+_SPACES = re.compile(r"\s+")
+# Ingredients asked to be absent: "fragrance-free", "fragrance free", "without fragrance",
+# "no parabens or sulfates" (a leading negation carries over a list of ingredients).
+_NEGATION_BEFORE = re.compile(r"(?<!\w)(?:without|no|free of|free from|avoid|avoiding)\s+$")
+_FREE_AFTER = re.compile(r"\s*-?\s*free(?!\w)")
+_LIST_JOIN = re.compile(r"\s*,?\s*(?:(?:and|or|nor)\s+)?")
+
+
+def normalize_query(query):
+    """Lowercase, collapse whitespace and drop trailing punctuation (the cache key form)."""
+    return _SPACES.sub(" ", query.lower()).strip(" ?!.")
+
+
+def _trie_pattern(phrases):
+    """Regex alternation of `phrases` factored as a trie; longer phrases win over their prefixes."""
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def emit(node):
+        alts = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie)
+
+
+class Entities:
+    """What one query asks for: the intent (or None) and the entities it mentions."""
+
+    __slots__ = ("intent", "brands", "skin_types", "categories", "ingredients", "excluded_ingredients")
+
+    def __init__(self):
+        self.intent = None
+        self.brands = []
+        self.skin_types = []
+        self.categories = []
+        self.ingredients = []
+        self.excluded_ingredients = []
+
+    def __repr__(self):
+        fields = ", ".join(f"{k}={getattr(self, k)!r}" for k in self.__slots__)
+        return f"Entities({fields})"
+
+
+class IntentMatcher:
+    """Compiled phrase automaton over the catalog's vocabulary."""
+
+    def __init__(self, brands=(), skin_types=(), categories=(), ingredients=()):
+        self._phrases = {}  # normalized phrase -> [(kind, value)]
+        for intent, words in INTENT_KEYWORDS.items():
+            for w in words:
+                self._add(w, "intent", intent)
+        for kind, values in (("brands", brands), ("skin_types", skin_types), ("categories", categories)):
+            for v in values:
+                self._add(v, kind, v)
+        for c in categories:
+            if c.endswith("s"):  # "moisturizer" as well as "Moisturizers"
+                self._add(c[:-1], "categories", c)
+        for term in ingredients:
+            if _INGREDIENT_TERM.fullmatch(term) and term not in _GENERIC_TERMS:
+                self._add(term, "ingredients", term)
+        self._regex = re.compile(r"(?<!\w)(?:" + _trie_pattern(self._phrases) + r")(?!\w)")
+
+    def _add(self, phrase, kind, value):
+        key = normalize_query(phrase)
+        if key:
+            entries = self._phrases.setdefault(key, [])
+            if (kind, value) not in entries:
+                entries.append((kind, value))
+
+    @classmethod
+    def from_catalog(cls, catalog, skin_types, ingredient_terms=()):
+        categories = set(catalog.category_names) | set(catalog.subcategory.tolist())
+        return cls(catalog.brand_names, skin_types, sorted(c for c in categories if c), ingredient_terms)
+
+    def __len__(self):
+        return len(self._phrases)
+
+    def match(self, query):
+        """
+        Entities mentioned in `query`; the intent is the first of INTENT_KEYWORDS
+        present. Negated ingredients ("X-free", "without X") go to excluded_ingredients.
+        """
+        found = Entities()
+        intents = set()
+        text = normalize_query(query)
+        negated_until = -1  # end of the last ingredient a leading negation applied to
+        for m in self._regex.finditer(text):
+            entries = self._phrases[m.group()]
+            negated = False
+            if any(kind == "ingredients" for kind, _ in entries):
+                negated = bool(_NEGATION_BEFORE.search(text, 0, m.start())
+                               or negated_until >= 0 and _LIST_JOIN.fullmatch(text, negated_until, m.start()))
+                negated_until = m.end() if negated else -1
+                negated = negated or bool(_FREE_AFTER.match(text, m.end()))
+            for kind, value in entries:
+                if kind == "intent":
+                    intents.add(value)
+                    continue
+                if negated:
+                    if kind != "ingredients":
+                        continue  # "fragrance-free" does not ask for the Fragrance category
+                    kind = "excluded_ingredients"
+                values = getattr(found, kind)
+                if value not in values:
+                    values.append(value)
+        found.intent = next((i for i in INTENT_KEYWORDS if i in intents), None)
+        return found
+
+
+class ResponseCache:
+    """Bounded LRU of answers, each expiring `ttl` seconds after it was stored."""
+
+    def __init__(self, max_entries=512, ttl=300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (answer, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, answer):
+        with self._lock:
+            self._entries[key] = (answer, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
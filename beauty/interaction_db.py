@@ -0,0 +1,259 @@
+"""
+Shared SQLite store of saved product interactions.
+
+One database file in WAL mode serves every dashboard process on the host:
+writers serialize on SQLite's write lock (waiting up to `busy_timeout`), while
+readers keep reading from their snapshot. Each record gets an AUTOINCREMENT
+`seq`, assigned inside the write transaction, so `seq` order is commit order
+and `read_since(cursor)` is the same cursor interface as InteractionLog and
+FirestoreMirror. Indexes on ts and (brand, ts) serve date-range and brand
+queries without scanning the history.
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from beauty.aggregates import record_epoch
+from beauty.records import RECORD_FIELDS, CursorSource
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS interactions (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    brand TEXT,
+    product_name TEXT,
+    skin_type TEXT,
+    price_range TEXT,
+    price_value REAL,
+    timestamp TEXT,
+    ts REAL
+);
+CREATE INDEX IF NOT EXISTS interactions_ts ON interactions (ts);
+CREATE INDEX IF NOT EXISTS interactions_brand_ts ON interactions (brand, ts);
+CREATE TABLE IF NOT EXISTS store_state (key TEXT PRIMARY KEY, value);
+"""
+_INSERT = ("INSERT INTO interactions (brand, product_name, skin_type, price_range, price_value, timestamp, ts) "
+           "VALUES (?, ?, ?, ?, ?, ?, ?)")
+_COLUMNS = "seq, brand, product_name, skin_type, price_range, price_value, timestamp"
+_SEQ_COLUMNS = ("seq",) + RECORD_FIELDS + ("ts",)
+
+
+def _row(rec):
+    ts = rec.get("timestamp")
+    if ts is not None and not isinstance(ts, str):
+        ts = ts.isoformat()
+    return tuple(rec.get(f) for f in RECORD_FIELDS) + (ts, record_epoch(rec))
+
+
+def _record(row):
+    return dict(zip(RECORD_FIELDS, row[1:6]), timestamp=row[6])
+
+
+def _where(since=None, until=None, brands=None):
+    """SQL condition and parameters for epoch bounds [since, until) and a brand set."""
+    clauses, params = [], []
+    if since is not None:
+        clauses.append("ts >= ?")
+        params.append(since)
+    if until is not None:
+        clauses.append("ts < ?")
+        params.append(until)
+    if brands is not None:
+        brands = list(brands)
+        clauses.append(f"brand IN ({', '.join('?' * len(brands))})")
+        params.extend(brands)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+class InteractionDB(CursorSource):
+    """
+    Interaction store backed by one SQLite file, safe for many threads and processes.
+
+    pool_size: connections kept per process. busy_timeout: seconds a writer
+    waits for another process's transaction before failing.
+    """
+
+    def __init__(self, path, pool_size=4, busy_timeout=30.0):
+        self.path = path
+        self.pool_size = pool_size
+        self.busy_timeout = busy_timeout
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._reset_pool()
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")  # persistent: recorded in the database file
+            with _transaction(conn):  # executescript would commit first; run the statements inside the lock
+                for statement in _SCHEMA.split(";"):
+                    if statement.strip():
+                        conn.execute(statement)
+
+    # ---------------- connections ----------------
+    def _reset_pool(self):
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue()
+        self._created = 0
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA synchronous=NORMAL")  # durable at checkpoints; a crash loses at most the last commits
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        """A pooled connection for this thread's use; connections are never shared across a fork."""
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset_pool()
+            idle = self._idle
+            try:
+                conn = idle.get_nowait()
+            except queue.Empty:
+                conn = None
+                if self._created < self.pool_size:
+                    self._created += 1
+                    conn = self._connect()
+        if conn is None:
+            conn = idle.get()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            idle.put(conn)
+
+    # ---------------- writes ----------------
+    def append(self, rec):
+        self.append_many([rec])
+
+    def append_many(self, recs):
+        rows = [_row(r) for r in recs]
+        if not rows:
+            return
+        with self._connection() as conn, _transaction(conn):
+            conn.executemany(_INSERT, rows)
+
+    def flush(self):
+        """Every append is committed when it returns; kept for InteractionLog compatibility."""
+
+    def import_once(self, name, chunks):
+        """
+        Append `chunks` (lists of records) in one transaction unless `name` was imported before.
+
+        Several processes may race on startup; the store_state marker makes
+        exactly one of them do the import. Returns the number of records added.
+        """
+        added = 0
+        with self._connection() as conn, _transaction(conn):
+            key = f"imported:{name}"
+            if conn.execute("SELECT 1 FROM store_state WHERE key = ?", (key,)).fetchone():
+                return 0
+            for chunk in chunks:
+                conn.executemany(_INSERT, [_row(r) for r in chunk])
+                added += len(chunk)
+            conn.execute("INSERT INTO store_state (key, value) VALUES (?, ?)", (key, added))
+        return added
+
+    def import_legacy(self, log_dir=None, json_path=None):
+        """One-off import of a previous NDJSON InteractionLog directory and/or local_product_clicks.json."""
+        from beauty.interaction_log import InteractionLog
+
+        added = 0
+        if log_dir and os.path.isdir(log_dir):
+            log = InteractionLog(log_dir)
+            added += self.import_once(f"log:{os.path.abspath(log_dir)}", log.iter_records())
+            log.close()
+        if json_path and os.path.exists(json_path):
+            try:
+                with open(json_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except Exception:
+                data = None
+            if isinstance(data, list):
+                added += self.import_once(f"json:{os.path.abspath(json_path)}", [data])
+        return added
+
+    # ---------------- reads ----------------
+    def _rows_since(self, columns, cursor, max_records):
+        sql = f"SELECT {columns} FROM interactions WHERE seq > ? ORDER BY seq"
+        params = [cursor]
+        if max_records is not None:
+            sql += " LIMIT ?"
+            params.append(max_records)
+        with self._connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def read_since(self, cursor=0, max_records=None):
+        """Records with seq > cursor in commit order, as (records, new_cursor)."""
+        rows = self._rows_since(_COLUMNS, cursor, max_records)
+        return [_record(r) for r in rows], (rows[-1][0] if rows else cursor)
+
+    def read_columns_since(self, cursor=0, max_records=None):
+        """
+        The same rows as read_since, as ({field: tuple}, new_cursor) with epoch
+        seconds under "ts", so InteractionFrame can encode them without a dict per record.
+        """
+        rows = self._rows_since(", ".join(_SEQ_COLUMNS), cursor, max_records)
+        columns = dict(zip(_SEQ_COLUMNS, zip(*rows))) if rows else {c: () for c in _SEQ_COLUMNS}
+        del columns["seq"]
+        return columns, (rows[-1][0] if rows else cursor)
+
+    def query_chunks(self, since=None, until=None, brands=None, chunk_records=10000, offset=0, limit=None):
+        """
+        Records with epoch ts in [since, until) and brand in `brands` (None: any),
+        oldest first, as lists of at most chunk_records. Uses the ts / (brand, ts)
+        indexes and reads one consistent snapshot. offset / limit select a
+        window of the matching records.
+        """
+        where, params = _where(since, until, brands)
+        sql = f"SELECT {_COLUMNS} FROM interactions{where} ORDER BY ts, seq"
+        if offset or limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [-1 if limit is None else limit, offset]
+        with self._connection() as conn, _transaction(conn, "BEGIN"):
+            cur = conn.execute(sql, params)
+            while True:
+                rows = cur.fetchmany(chunk_records)
+                if not rows:
+                    return
+                yield [_record(r) for r in rows]
+
+    def count(self, since=None, until=None, brands=None):
+        """Number of records matching the same filters as query_chunks."""
+        where, params = _where(since, until, brands)
+        with self._connection() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM interactions{where}", params).fetchone()[0]
+
+    def counts_by_brand(self, since=None, until=None, brands=None):
+        """{brand: count} over the same filters, most saved first."""
+        where, params = _where(since, until, brands)
+        sql = f"SELECT brand, COUNT(*) AS n FROM interactions{where} GROUP BY brand ORDER BY n DESC"
+        with self._connection() as conn:
+            return dict(conn.execute(sql, params).fetchall())
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, queue.LifoQueue()
+            self._created = 0
+        while True:
+            try:
+                idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+@contextmanager
+def _transaction(conn, begin="BEGIN IMMEDIATE"):
+    """Explicit transaction; IMMEDIATE takes the write lock up front so writers queue instead of deadlocking."""
+    conn.execute(begin)
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
@@ -0,0 +1,255 @@
+"""
+Append-only log of saved product interactions.
+
+Records are stored as newline-delimited JSON in numbered segment files inside
+one directory. Each segment is named after the global byte offset where it
+starts, so a reader's position in the log is a single integer that stays valid
+across rotation and compaction. Appends take an exclusive file lock (safe for
+several sessions/processes) and fsync is batched by count and time. Consumed
+segments can be deleted (drop_before) without moving later offsets.
+"""
+
+import json
+import os
+import threading
+import time
+
+from beauty.records import CursorSource
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".ndjson"
+
+
+def _segment_name(start):
+    return f"{SEGMENT_PREFIX}{start:016d}{SEGMENT_SUFFIX}"
+
+
+class InteractionLog(CursorSource):
+    """
+    Segmented NDJSON log with batched fsync, locking, rotation and compaction.
+
+    fsync_every / fsync_interval: fsync after that many appended records or
+    seconds, whichever comes first. segment_bytes: rotate to a new segment once
+    the active one grows past this size. compact_after: merge closed segments
+    once there are more than this many of them.
+    """
+
+    def __init__(self, directory, fsync_every=32, fsync_interval=1.0,
+                 segment_bytes=4 * 1024 * 1024, compact_after=8, compact_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.segment_bytes = segment_bytes
+        self.compact_after = compact_after
+        self.compact_bytes = compact_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._thread_lock = threading.Lock()
+        self._lock_path = os.path.join(directory, ".lock")
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+        self._fh = None
+        self._fh_start = None
+
+    # ---------------- locking ----------------
+    class _Locked:
+        def __init__(self, log):
+            self.log = log
+
+        def __enter__(self):
+            self.log._thread_lock.acquire()
+            self.fh = open(self.log._lock_path, "a")
+            if fcntl:
+                fcntl.flock(self.fh.fileno(), fcntl.LOCK_EX)
+            return self
+
+        def __exit__(self, *exc):
+            if fcntl:
+                fcntl.flock(self.fh.fileno(), fcntl.LOCK_UN)
+            self.fh.close()
+            self.log._thread_lock.release()
+
+    def _locked(self):
+        return InteractionLog._Locked(self)
+
+    # ---------------- segments ----------------
+    def segments(self):
+        """Sorted (start_offset, path) for every segment on disk."""
+        out = []
+        for fn in os.listdir(self.directory):
+            if fn.startswith(SEGMENT_PREFIX) and fn.endswith(SEGMENT_SUFFIX):
+                start = int(fn[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+                out.append((start, os.path.join(self.directory, fn)))
+        out.sort()
+        return out
+
+    def _active_handle(self):
+        """Open (or reuse) the append handle on the newest segment. Caller holds the lock."""
+        segs = self.segments()
+        if not segs:
+            start, path = 0, os.path.join(self.directory, _segment_name(0))
+        else:
+            start, path = segs[-1]
+        if self._fh is None or self._fh_start != start or self._fh.closed:
+            self._close_handle()
+            self._fh = open(path, "ab")
+            self._fh_start = start
+            # A crash can leave a torn last line; terminate it so it is skipped on read.
+            size = self._fh.tell()
+            if size:
+                with open(path, "rb") as f:
+                    f.seek(size - 1)
+                    if f.read(1) != b"\n":
+                        self._fh.write(b"\n")
+        return self._fh
+
+    def _close_handle(self):
+        if self._fh is not None and not self._fh.closed:
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+            self._fh.close()
+        self._fh = None
+        self._fh_start = None
+
+    # ---------------- writing ----------------
+    def append(self, rec):
+        self.append_many([rec])
+
+    def append_many(self, recs):
+        """Append records as one write under the lock."""
+        if not recs:
+            return
+        payload = b"".join(
+            json.dumps(r, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n" for r in recs
+        )
+        with self._locked():
+            fh = self._active_handle()
+            fh.write(payload)
+            fh.flush()
+            self._unsynced += len(recs)
+            now = time.monotonic()
+            if self._unsynced >= self.fsync_every or now - self._last_fsync >= self.fsync_interval:
+                self._fsync()
+            if fh.tell() >= self.segment_bytes:
+                self._rotate()
+
+    def _fsync(self):
+        if self._fh is not None and not self._fh.closed:
+            os.fsync(self._fh.fileno())
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+
+    def flush(self):
+        """Force pending appends to disk."""
+        with self._locked():
+            self._fsync()
+
+    def close(self):
+        with self._locked():
+            self._close_handle()
+
+    def _rotate(self):
+        """Start a new segment after the active one. Caller holds the lock."""
+        end = self._fh_start + self._fh.tell()
+        self._close_handle()
+        open(os.path.join(self.directory, _segment_name(end)), "ab").close()
+        if len(self.segments()) - 1 > self.compact_after:
+            self._compact()
+
+    def compact(self):
+        """Merge runs of small closed segments into larger files."""
+        with self._locked():
+            self._compact()
+
+    def _compact(self):
+        # Concatenation keeps every byte at the same global offset, so reader
+        # cursors remain valid; the merged file takes the first segment's name.
+        closed = self.segments()[:-1]
+        i = 0
+        while i < len(closed):
+            run = [closed[i]]
+            size = os.path.getsize(closed[i][1])
+            j = i + 1
+            while j < len(closed) and size + os.path.getsize(closed[j][1]) <= self.compact_bytes:
+                size += os.path.getsize(closed[j][1])
+                run.append(closed[j])
+                j += 1
+            if len(run) > 1:
+                tmp = run[0][1] + ".tmp"
+                with open(tmp, "wb") as out:
+                    for _, path in run:
+                        with open(path, "rb") as f:
+                            while True:
+                                chunk = f.read(1 << 20)
+                                if not chunk:
+                                    break
+                                out.write(chunk)
+                    out.flush()
+                    os.fsync(out.fileno())
+                os.replace(tmp, run[0][1])
+                for _, path in run[1:]:
+                    os.remove(path)
+            i = j
+
+    def drop_before(self, offset):
+        """
+        Delete the segments that end at or before global offset `offset` (e.g.
+        records already replayed). Later offsets are unchanged, so cursors at or
+        past `offset` stay valid. A fully consumed active segment is rotated
+        first so it can go too. Returns the number of bytes freed.
+        """
+        freed = 0
+        with self._locked():
+            segs = self.segments()
+            if segs and segs[-1][0] < offset == segs[-1][0] + os.path.getsize(segs[-1][1]):
+                self._active_handle()
+                self._rotate()
+                segs = self.segments()
+            for start, path in segs[:-1]:
+                size = os.path.getsize(path)
+                if start + size > offset:
+                    break
+                os.remove(path)
+                freed += size
+        return freed
+
+    # ---------------- reading ----------------
+    def read_since(self, cursor=0, max_records=None):
+        """
+        Records appended at or after global offset `cursor`.
+
+        Returns (records, new_cursor). Only complete lines are consumed, so a
+        record being written concurrently is picked up on the next call.
+        """
+        records = []
+        pos = cursor
+        for start, path in self.segments():
+            try:
+                size = os.path.getsize(path)
+            except FileNotFoundError:  # merged away by a concurrent compaction
+                continue
+            if start + size <= pos or start > pos:
+                continue
+            try:
+                with open(path, "rb") as f:
+                    f.seek(pos - start)
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            break
+                        pos += len(line)
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            records.append(json.loads(line))
+                        except ValueError:
+                            continue  # torn write from a crash
+                        if max_records is not None and len(records) >= max_records:
+                            return records, pos
+            except FileNotFoundError:
+                continue
+        return records, pos
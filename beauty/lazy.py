@@ -0,0 +1,62 @@
+"""Deferred imports, so heavy or optional libraries load on first use instead of at startup."""
+
+import importlib
+import importlib.util
+import threading
+from contextlib import contextmanager
+
+# One lock for every lazy import, so two sessions never import modules
+# concurrently, and code that must not see a module half-initialized can wait
+# for imports in flight (see settled_imports).
+_IMPORT_LOCK = threading.RLock()
+
+
+class LazyModule:
+    """Stand-in for a module that imports it on first attribute access."""
+
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            with _IMPORT_LOCK:
+                module = self.__dict__["_module"]
+                if module is None:
+                    module = importlib.import_module(self.__dict__["_name"])
+                    self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_module"] is not None else "not loaded"
+        return f"<lazy module {self.__dict__['_name']!r} ({state})>"
+
+
+def lazy_import(name):
+    """Lazy proxy for `name`."""
+    return LazyModule(name)
+
+
+@contextmanager
+def settled_imports():
+    """
+    Run the body while no lazy import is in flight.
+
+    plotly's validators and JSON encoder probe sys.modules for pandas without
+    importing it; while another session's thread is still importing pandas
+    they would find a half-initialized module.
+    """
+    with _IMPORT_LOCK:
+        yield
+
+
+def is_installed(name):
+    """True if `name` can be imported, without importing it."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
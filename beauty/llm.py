@@ -0,0 +1,186 @@
+"""
+Optional LLM backend for the chatbot.
+
+Talks to any OpenAI-compatible `/chat/completions` endpoint (api.openai.com, a
+local model server, or the stub below) from one background asyncio loop. The
+same question asked again while its completion is in flight joins that request
+instead of sending another; a caller waits at most `timeout` seconds and then
+gets the rule-based answer, while a late completion is still kept for the next
+ask. Only the standard library is used.
+
+    python -m beauty.llm stub --port 8765 --delay 0.5
+    BEAUTY_LLM_URL=http://127.0.0.1:8765/v1 streamlit run beauty_dashboard_app.py
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from beauty.intents import ResponseCache
+
+SYSTEM_PROMPT = (
+    "You are a beauty-retail insights assistant. Answer in at most three sentences, "
+    "using only the facts provided from the dashboard. Tone: {persona}."
+)
+
+
+def build_messages(question, facts, persona):
+    """Chat messages asking the model to phrase the rule-based `facts` as an answer to `question`."""
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT.format(persona=persona)},
+        {"role": "user", "content": f"Question: {question}\nFacts from the dashboard: {facts}"},
+    ]
+
+
+class LLMBackend:
+    """Coalescing, time-boxed chat completions with a cache of finished answers."""
+
+    def __init__(self, base_url, api_key=None, model="gpt-4o-mini", timeout=2.0,
+                 request_timeout=30.0, max_entries=512, ttl=300.0):
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.api_key = api_key
+        self.model = model
+        self.timeout = timeout
+        self.request_timeout = request_timeout
+        self.requests = 0
+        self.fallbacks = 0
+        self._answers = ResponseCache(max_entries, ttl)
+        self._inflight = {}  # key -> asyncio.Task; only touched on the loop thread
+        self._loop = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="llm-backend", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def ask(self, key, messages, fallback):
+        """
+        (answer, from_llm) for `messages`, identified by the hashable `key`.
+
+        Returns (fallback, False) when the endpoint fails or does not answer
+        within `timeout`.
+        """
+        answer = self._answers.get(key)
+        if answer is not None:
+            return answer, True
+        future = asyncio.run_coroutine_threadsafe(self._complete(key, messages), self._ensure_loop())
+        try:
+            return future.result(self.timeout), True
+        except Exception:  # failed, or timed out: a late completion is still cached when it lands
+            self.fallbacks += 1
+            return fallback, False
+
+    async def _complete(self, key, messages):
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.ensure_future(self._fetch(key, messages))
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key, messages):
+        self.requests += 1
+        answer = await asyncio.get_running_loop().run_in_executor(None, self._post, messages)
+        self._answers.set(key, answer)
+        return answer
+
+    def _post(self, messages):
+        body = json.dumps({"model": self.model, "messages": messages}).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        request = urllib.request.Request(self.url, data=body, headers=headers, method="POST")
+        with urllib.request.urlopen(request, timeout=self.request_timeout) as resp:
+            payload = json.load(resp)
+        return payload["choices"][0]["message"]["content"].strip()
+
+    def close(self):
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            asyncio.run_coroutine_threadsafe(self._cancel_inflight(), loop).result(self.timeout)
+            loop.call_soon_threadsafe(loop.stop)
+
+    async def _cancel_inflight(self):
+        tasks = list(self._inflight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# ---------------- stub server ----------------
+class _StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        if not self.path.endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        with self.server.stats_lock:
+            self.server.stats["requests"] += 1
+        time.sleep(self.server.delay)
+        question = request.get("messages", [{}])[-1].get("content", "").splitlines()[0]
+        self._reply({"choices": [{"index": 0, "message": {"role": "assistant", "content": f"(stub) {question}"}}]})
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/stats"):
+            with self.server.stats_lock:
+                self._reply(dict(self.server.stats))
+        else:
+            self.send_error(404)
+
+    def _reply(self, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub(host="127.0.0.1", port=0, delay=0.0):
+    """
+    Serve a fake OpenAI-compatible endpoint on a background thread.
+
+    Every completion sleeps `delay` seconds and echoes the question; GET
+    /v1/stats reports how many completions were requested. Returns
+    (server, base_url); call server.shutdown() to stop it.
+    """
+    server = ThreadingHTTPServer((host, port), _StubHandler)
+    server.daemon_threads = True
+    server.delay = delay
+    server.stats = {"requests": 0}
+    server.stats_lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, name="llm-stub", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chatbot LLM backend tools.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    stub = sub.add_parser("stub", help="serve a local OpenAI-compatible stub endpoint")
+    stub.add_argument("--host", default="127.0.0.1")
+    stub.add_argument("--port", type=int, default=8765)
+    stub.add_argument("--delay", type=float, default=0.5, help="seconds each completion takes")
+    args = parser.parse_args(argv)
+
+    server, url = start_stub(args.host, args.port, args.delay)
+    print(f"Stub LLM endpoint at {url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
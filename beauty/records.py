@@ -0,0 +1,22 @@
+"""
+The saved-interaction record shared by every store.
+
+A record is a dict of RECORD_FIELDS plus a "timestamp". Stores expose it
+through `read_since(cursor, max_records)`, returning (records, new_cursor);
+CursorSource adds whole-history iteration on top of that.
+"""
+
+RECORD_FIELDS = ("brand", "product_name", "skin_type", "price_range", "price_value")
+
+
+class CursorSource:
+    """Mixin for stores with `read_since`."""
+
+    def iter_records(self, chunk_records=10000):
+        """Yield the whole history as lists of at most chunk_records records."""
+        cursor = 0
+        while True:
+            recs, cursor = self.read_since(cursor, max_records=chunk_records)
+            if not recs:
+                return
+            yield recs
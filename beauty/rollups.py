@@ -0,0 +1,221 @@
+"""
+Time-series rollups over saved interactions.
+
+Interactions are bucketed per brand and per product into hourly and daily
+count series held as (key x bucket) int32 arrays. Like AggregateStore, a
+rollup remembers the source cursor it has consumed, so each refresh only folds
+in new records, and it is snapshotted to .npz. Hourly series keep a bounded
+window; daily series keep the whole history.
+
+Forecasts (beauty.forecast) are computed for all keys of a field in one batch
+over closed buckets only and cached until the next bucket closes.
+"""
+
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from beauty.aggregates import record_epoch
+from beauty.forecast import holt_forecast
+
+ROLLUP_FIELDS = ("brand", "product_name")
+# level -> bucket width in seconds
+LEVELS = {"hourly": 3600, "daily": 86400}
+HOURLY_RETENTION = 14 * 24
+
+
+class _Buckets:
+    """Growable (key x bucket) count matrix starting at bucket index `origin`."""
+
+    def __init__(self, retention=None, counts=None, origin=None):
+        self.retention = retention
+        self.counts = np.zeros((8, 0), dtype=np.int32) if counts is None else counts
+        self.origin = origin
+
+    @property
+    def end(self):
+        """One past the last bucket index held."""
+        return (self.origin or 0) + self.counts.shape[1]
+
+    def _ensure(self, n_keys, first, last):
+        rows, cols = self.counts.shape
+        if self.origin is None:
+            self.origin = first
+        lo = min(first, self.origin)
+        if self.retention is not None:
+            lo = max(lo, last + 1 - self.retention, self.origin)
+        hi = max(last + 1, self.origin + cols)
+        new_rows = max(rows, n_keys)
+        if new_rows > rows:
+            new_rows = max(new_rows, rows * 2)
+        if lo != self.origin or hi - lo != cols or new_rows != rows:
+            grown = np.zeros((new_rows, hi - lo), dtype=np.int32)
+            keep_from = max(lo, self.origin)
+            if keep_from < self.origin + cols:
+                src = self.counts[:, keep_from - self.origin:]
+                grown[:rows, keep_from - lo:keep_from - lo + src.shape[1]] = src
+            self.counts, self.origin = grown, lo
+
+    def add(self, key_ids, buckets, n_keys):
+        if not len(buckets):
+            return
+        self._ensure(n_keys, int(buckets.min()), int(buckets.max()))
+        cols = buckets - self.origin
+        ok = cols >= 0  # older than the retained window
+        np.add.at(self.counts, (key_ids[ok], cols[ok]), 1)
+
+
+class TimeSeriesRollup:
+    """Hourly and daily interaction counts per brand and per product, plus cached forecasts."""
+
+    def __init__(self, path=None, save_interval=5.0, hourly_retention=HOURLY_RETENTION, chunk_records=50_000):
+        self.path = path
+        self.save_interval = save_interval
+        self.chunk_records = chunk_records
+        self.hourly_retention = hourly_retention
+        self._lock = threading.Lock()
+        self._last_save = 0.0
+        self.version = 0
+        self._reset()
+        if path and os.path.exists(path):
+            self._load()
+
+    def _reset(self):
+        self.cursor = 0
+        self.version += 1  # never reused, so a forecast from before a rebuild is never served after it
+        self.keys = {f: [] for f in ROLLUP_FIELDS}
+        self._ids = {f: {} for f in ROLLUP_FIELDS}
+        self.buckets = {
+            (f, level): _Buckets(self.hourly_retention if level == "hourly" else None)
+            for f in ROLLUP_FIELDS for level in LEVELS
+        }
+        self._forecasts = {}
+
+    # ---------------- updates ----------------
+    def _key_ids(self, field, values):
+        ids, keys = self._ids[field], self.keys[field]
+        out = np.empty(len(values), dtype=np.int64)
+        for i, v in enumerate(values):
+            k = ids.get(v)
+            if k is None:
+                k = ids[v] = len(keys)
+                keys.append(v)
+            out[i] = k
+        return out
+
+    def _apply(self, records):
+        stamped = [(r, t) for r, t in ((r, record_epoch(r)) for r in records) if t is not None]
+        if not stamped:
+            return
+        epochs = np.array([t for _, t in stamped], dtype=np.float64)
+        for f in ROLLUP_FIELDS:
+            present = [(i, r[f]) for i, (r, _) in enumerate(stamped) if r.get(f) is not None]
+            if not present:
+                continue
+            rows = np.array([i for i, _ in present], dtype=np.int64)
+            ids = self._key_ids(f, [v for _, v in present])
+            for level, width in LEVELS.items():
+                buckets = (epochs[rows] // width).astype(np.int64)
+                self.buckets[(f, level)].add(ids, buckets, len(self.keys[f]))
+        self.version += 1
+
+    def apply(self, records):
+        with self._lock:
+            self._apply(records)
+
+    def catch_up(self, source):
+        """Fold in everything past our cursor, chunk by chunk. Returns the number of new records."""
+        added = 0
+        with self._lock:
+            while True:
+                records, cursor = source.read_since(self.cursor, max_records=self.chunk_records)
+                self._apply(records)
+                self.cursor = cursor
+                added += len(records)
+                if len(records) < self.chunk_records:
+                    break
+            if added and self.path and time.monotonic() - self._last_save >= self.save_interval:
+                self._save()
+            return added
+
+    def rebuild(self, source):
+        with self._lock:
+            self._reset()
+        self.catch_up(source)
+        self.save()
+
+    # ---------------- reads ----------------
+    def series(self, field, level="daily", start=None, end=None):
+        """
+        (key names, start bucket, counts) for buckets [start, end) of `level`.
+
+        Bucket indexes are epoch seconds // bucket width; defaults cover
+        everything held. Buckets outside the stored range read as zero.
+        """
+        b = self.buckets[(field, level)]
+        n_keys = len(self.keys[field])
+        origin = b.origin if b.origin is not None else 0
+        start = origin if start is None else start
+        end = b.end if end is None else end
+        out = np.zeros((n_keys, max(end - start, 0)), dtype=np.int32)
+        lo, hi = max(start, origin), min(end, b.end)
+        if hi > lo:
+            out[:, lo - start:hi - start] = b.counts[:n_keys, lo - origin:hi - origin]
+        return list(self.keys[field]), start, out
+
+    def forecast(self, field, level="daily", horizon=7, history=90, now=None):
+        """
+        Forecast the next `horizon` buckets for every key of `field` in one batch.
+
+        Fitted on the last `history` closed buckets (the current, still-filling
+        bucket is excluded) and cached until another bucket closes or new
+        records arrive (late ones, e.g. from a mirror sync or spill replay, can
+        land in closed buckets). Returns (key names, first forecast bucket,
+        float array keys x horizon).
+        """
+        width = LEVELS[level]
+        closed_end = int((time.time() if now is None else now) // width)
+        cache_key = (field, level, horizon, history)
+        with self._lock:
+            stamp = (closed_end, self.version)
+            cached = self._forecasts.get(cache_key)
+            if cached is not None and cached[0] == stamp:
+                return cached[1]
+            keys, _, y = self.series(field, level, closed_end - history, closed_end)
+        values, _ = holt_forecast(y, horizon)
+        result = (keys, closed_end, values)
+        self._forecasts[cache_key] = (stamp, result)
+        return result
+
+    # ---------------- persistence ----------------
+    def save(self):
+        if self.path:
+            with self._lock:
+                self._save()
+
+    def _save(self):
+        meta = {"cursor": self.cursor, "keys": self.keys, "hourly_retention": self.hourly_retention,
+                "origins": {f"{f}/{level}": b.origin for (f, level), b in self.buckets.items()}}
+        arrays = {f"{f}/{level}": b.counts[:len(self.keys[f])] for (f, level), b in self.buckets.items()}
+        tmp = f"{self.path}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(tmp, meta=np.array(json.dumps(meta, ensure_ascii=False)), **arrays)
+        os.replace(tmp, self.path)
+        self._last_save = time.monotonic()
+
+    def _load(self):
+        try:
+            with np.load(self.path) as data:
+                meta = json.loads(str(data["meta"]))
+                arrays = {name: data[name] for name in data.files if name != "meta"}
+        except (OSError, ValueError, KeyError):
+            return  # unreadable snapshot: start empty and catch up from the source
+        self.cursor = meta["cursor"]
+        self.keys = {f: list(meta["keys"].get(f, [])) for f in ROLLUP_FIELDS}
+        self._ids = {f: {k: i for i, k in enumerate(self.keys[f])} for f in ROLLUP_FIELDS}
+        for (f, level), b in self.buckets.items():
+            name = f"{f}/{level}"
+            if name in arrays:
+                b.counts, b.origin = arrays[name].astype(np.int32), meta["origins"][name]
@@ -0,0 +1,61 @@
+"""Synthetic catalogs and save histories for benchmarks, shaped like the real data."""
+
+import numpy as np
+
+from beauty.catalog import SKIN_TYPES, USD_TO_INR, Catalog
+
+CATEGORIES = ["Skincare", "Hair", "Makeup", "Mini Size", "Bath & Body", "Men", "Fragrance", "Tools & Brushes"]
+
+
+def synthetic_catalog(n, n_brands=None, seed=0):
+    """Catalog of n random products (log-normal prices and loves, ~15% skin-tagged)."""
+    rng = np.random.default_rng(seed)
+    n_brands = n_brands or max(5, min(2000, n // 50))
+    ids = np.arange(n)
+    skin_mask = np.where(rng.random(n) < 0.15, rng.integers(1, 32, n), 0).astype(np.uint8)
+    columns = {
+        "product_id": np.array([f"S{i:08d}" for i in ids], dtype=object),
+        "name": np.array([f"Product {i}" for i in ids], dtype=object),
+        "brand_code": rng.zipf(1.3, n).clip(1, n_brands).astype(np.int32) - 1,
+        "category_code": rng.integers(0, len(CATEGORIES), n).astype(np.int16),
+        "subcategory": np.full(n, "", dtype=object),
+        "price": (rng.lognormal(3.4, 0.6, n) * USD_TO_INR).astype(np.float32),
+        "rating": rng.uniform(2.5, 5.0, n).astype(np.float32),
+        "loves": rng.lognormal(8, 1.8, n).astype(np.int64),
+        "reviews": rng.lognormal(4, 1.5, n).astype(np.int32),
+        "skin_mask": skin_mask,
+    }
+    return Catalog(columns, [f"Brand {b}" for b in range(n_brands)], list(CATEGORIES), digest=f"synthetic-{n}-{seed}")
+
+
+def synthetic_interactions(catalog, n, days=30, seed=0, chunk_records=100_000, end=None):
+    """
+    Yield lists of save records (at most chunk_records each) for n saves spread
+    over the `days` before `end` (epoch seconds, default now); products are
+    picked in proportion to their loves.
+    """
+    from datetime import datetime, timezone
+
+    from beauty.brand_stats import price_tier
+
+    rng = np.random.default_rng(seed)
+    end = datetime.now(timezone.utc).timestamp() if end is None else end
+    weights = catalog.loves.astype(np.float64) + 1
+    weights /= weights.sum()
+    for lo in range(0, n, chunk_records):
+        size = min(chunk_records, n - lo)
+        rows = rng.choice(len(catalog), size=size, p=weights)
+        skins = rng.integers(0, len(SKIN_TYPES), size)
+        # chronological across chunks, like a real append-only log
+        stamps = end - days * 86400 * (1 - (lo + np.sort(rng.random(size)) * size) / n)
+        yield [
+            {
+                "brand": catalog.brand_names[catalog.brand_code[r]],
+                "product_name": catalog.name[r],
+                "skin_type": SKIN_TYPES[s],
+                "price_range": price_tier(catalog.price[r]),
+                "price_value": int(round(float(catalog.price[r]))),
+                "timestamp": datetime.fromtimestamp(t, timezone.utc).replace(tzinfo=None).isoformat(),
+            }
+            for r, s, t in zip(rows, skins, stamps)
+        ]
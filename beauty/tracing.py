@@ -0,0 +1,204 @@
+"""
+Per-section timing for the dashboard script.
+
+Sections are timed with `tracer.span(name)` (a context manager) or
+`tracer.start(name)` / `tracer.stop(token)` for stretches of top-level script
+code. Each section feeds a Prometheus-style histogram plus a rolling window of
+recent samples for quantiles; whole reruns are timed between `begin_rerun()`
+and `end_rerun()` and the slowest are kept with their section breakdown.
+
+When disabled (the default), `span` returns a shared no-op object and `start`
+returns None, so instrumented code pays one attribute check per section.
+"""
+
+import bisect
+import heapq
+import os
+import threading
+import time
+from collections import deque
+
+# Histogram upper bounds in seconds (+Inf is implicit).
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "t0")
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.record(self.name, time.perf_counter() - self.t0)
+        return False
+
+
+class Histogram:
+    """Cumulative bucket counts (for Prometheus) plus the last `window` samples (for quantiles)."""
+
+    def __init__(self, buckets=BUCKETS, window=1000):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+        self.recent.append(seconds)
+
+    def quantile(self, q):
+        """q-quantile of the rolling window, or None when empty."""
+        return _quantile(sorted(self.recent), q)
+
+
+def _quantile(ordered, q):
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Tracer:
+    """Process-wide section histograms and the slowest reruns."""
+
+    def __init__(self, enabled=False, slow_reruns=20, window=1000, export_path=None, export_interval=15.0):
+        self.enabled = enabled
+        self.slow_reruns = slow_reruns
+        self.window = window
+        self.export_path = export_path
+        self.export_interval = export_interval
+        self.histograms = {}
+        self._slowest = []  # min-heap of (seconds, seq, {section: seconds})
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._last_export = 0.0
+
+    # ---------------- timing ----------------
+    def span(self, name):
+        """Context manager timing one section; a no-op when disabled."""
+        if not self.enabled:
+            return _NOOP
+        return _Span(self, name)
+
+    def start(self, name):
+        """Token for timing top-level script code up to `stop(token)`; None when disabled."""
+        if not self.enabled:
+            return None
+        return (name, time.perf_counter())
+
+    def stop(self, token):
+        if token is not None:
+            self.record(token[0], time.perf_counter() - token[1])
+
+    def record(self, name, seconds):
+        with self._lock:
+            hist = self.histograms.get(name)
+            if hist is None:
+                hist = self.histograms[name] = Histogram(window=self.window)
+            hist.observe(seconds)
+        sections = getattr(self._local, "sections", None)
+        if sections is not None:
+            sections[name] = sections.get(name, 0.0) + seconds
+
+    def begin_rerun(self):
+        """Start timing a script run on this thread (a rerun that never ended is discarded)."""
+        if not self.enabled:
+            self._local.sections = None
+            return
+        self._local.sections = {}
+        self._local.t0 = time.perf_counter()
+
+    def end_rerun(self):
+        sections = getattr(self._local, "sections", None)
+        if sections is None:
+            return
+        self._local.sections = None
+        total = time.perf_counter() - self._local.t0
+        self.record("rerun", total)
+        with self._lock:
+            self._seq += 1
+            entry = (total, self._seq, time.time(), sections)
+            if len(self._slowest) < self.slow_reruns:
+                heapq.heappush(self._slowest, entry)
+            elif total > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+        if self.export_path and time.monotonic() - self._last_export >= self.export_interval:
+            self.export(self.export_path)
+
+    # ---------------- reporting ----------------
+    def summary(self):
+        """[{section, count, p50_ms, p95_ms, max_ms, total_s}] sorted by total time."""
+        rows = []
+        with self._lock:  # record() appends to the windows from other sessions' threads
+            items = [(name, h.count, h.sum, sorted(h.recent)) for name, h in self.histograms.items()]
+        for name, count, total, ordered in items:
+            if not ordered:
+                continue
+            rows.append({
+                "section": name,
+                "count": count,
+                "p50_ms": _quantile(ordered, 0.5) * 1000,
+                "p95_ms": _quantile(ordered, 0.95) * 1000,
+                "max_ms": ordered[-1] * 1000,
+                "total_s": total,
+            })
+        return sorted(rows, key=lambda r: -r["total_s"])
+
+    def slowest(self):
+        """[(seconds, epoch, {section: seconds})] for the slowest reruns, slowest first."""
+        with self._lock:
+            entries = sorted(self._slowest, reverse=True)
+        return [(total, at, dict(sections)) for total, _, at, sections in entries]
+
+    def prometheus(self, metric="beauty_section_seconds"):
+        """Histograms in the Prometheus text exposition format."""
+        lines = [f"# HELP {metric} Time spent in dashboard script sections.", f"# TYPE {metric} histogram"]
+        with self._lock:
+            for name, h in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, c in zip(h.buckets + (float("inf"),), h.counts):
+                    cumulative += c
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{metric}_bucket{{section="{name}",le="{le}"}} {cumulative}')
+                lines.append(f'{metric}_sum{{section="{name}"}} {h.sum:.6f}')
+                lines.append(f'{metric}_count{{section="{name}"}} {h.count}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, path):
+        """Write the Prometheus text to `path` atomically (e.g. for node_exporter's textfile collector)."""
+        self._last_export = time.monotonic()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.prometheus())
+        os.replace(tmp, path)
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+            self._slowest = []
+
+
+# Shared by every session in this process; the app enables it from the environment.
+tracer = Tracer()
@@ -0,0 +1,226 @@
+"""
+Write-behind queue for Firestore save clicks.
+
+The Save button only enqueues the record; a background thread groups pending
+records into `batch()` commits when either `max_batch` records are waiting or
+the oldest has waited `flush_interval` seconds. Failed commits are retried with
+exponential backoff. When Firestore stays unavailable, or the queue is full,
+records are spilled to a local InteractionLog and replayed once commits
+succeed again; replayed segments are then deleted from the spill.
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from beauty.records import RECORD_FIELDS
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class WriteBehindQueue:
+    """
+    Bounded queue of click records committed to Firestore in batches.
+
+    db: firestore client (or FakeFirestore). spill: InteractionLog used as
+    overflow; without one, records that cannot be committed are dropped and
+    counted in `stats["dropped"]`. server_timestamp: sentinel to store as the
+    document timestamp (firestore.SERVER_TIMESTAMP). Replayed spill records are
+    stamped at commit time too, so mirrors syncing past their cursor still see
+    them, and keep the click time in `client_timestamp`.
+    """
+
+    def __init__(self, db, collection="product_clicks", spill=None, max_batch=500, flush_interval=1.0,
+                 max_pending=10000, max_retries=4, backoff=0.5, max_backoff=30.0, replay_interval=30.0,
+                 server_timestamp=None):
+        self.db = db
+        self.collection = collection
+        self.spill = spill
+        self.max_batch = min(max_batch, 500)  # Firestore batch limit
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.replay_interval = replay_interval
+        self.server_timestamp = server_timestamp
+        self.stats = {"queued": 0, "committed": 0, "commits": 0, "retries": 0, "spilled": 0, "replayed": 0, "dropped": 0}
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._inflight = 0
+        self._closing = False
+        self._flush_requested = False
+        self._unavailable = False
+        self._last_replay = 0.0
+        self._thread = threading.Thread(target=self._run, name="firestore-write-behind", daemon=True)
+        self._thread.start()
+
+    # ---------------- producer side ----------------
+    def submit(self, rec):
+        """Queue a record. Returns False if it went straight to the spill log instead."""
+        with self._cond:
+            if not self._closing and not self._unavailable and len(self._pending) < self.max_pending:
+                self._pending.append((time.monotonic(), rec))
+                self.stats["queued"] += 1
+                self._cond.notify()
+                return True
+        self._spill([rec])
+        return False
+
+    def flush(self, timeout=None):
+        """Block until everything queued so far has been committed or spilled."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            try:
+                while self._pending or self._inflight:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._cond.wait(remaining if remaining is not None else 0.1)
+            finally:
+                self._flush_requested = False
+        return True
+
+    def close(self, timeout=10.0):
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        self._thread.join(timeout)
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    # ---------------- committer thread ----------------
+    def _run(self):
+        while True:
+            with self._cond:
+                batch = self._next_batch()
+                if batch is None:
+                    return
+                self._inflight = len(batch)
+            try:
+                if batch:
+                    if self._commit_with_retry(batch):
+                        self.stats["committed"] += len(batch)
+                        self._replay_spill()
+                    else:
+                        self._spill(batch)
+                elif time.monotonic() - self._last_replay >= self.replay_interval:
+                    self._replay_spill()
+            finally:
+                with self._cond:
+                    self._inflight = 0
+                    self._cond.notify_all()
+
+    def _next_batch(self):
+        """
+        Wait for a full, overdue or flushed batch; caller holds the condition.
+        Returns [] on an idle tick and None once closed and drained.
+        """
+        idle_until = time.monotonic() + self.flush_interval
+        while True:
+            now = time.monotonic()
+            if self._pending:
+                age = now - self._pending[0][0]
+                if (self._closing or self._flush_requested or len(self._pending) >= self.max_batch
+                        or age >= self.flush_interval):
+                    n = min(self.max_batch, len(self._pending))
+                    return [self._pending.popleft()[1] for _ in range(n)]
+                self._cond.wait(self.flush_interval - age)
+            elif self._closing:
+                return None
+            elif now >= idle_until:
+                return []
+            else:
+                self._cond.wait(idle_until - now)
+
+    def _commit_with_retry(self, records, replayed=False):
+        coll = self.db.collection(self.collection)
+        # IDs are fixed before the first attempt: a commit that landed but timed out
+        # on the client is rewritten by the retry instead of duplicated.
+        writes = [(coll.document(), self._document(rec, replayed)) for rec in records]
+        for attempt in range(self.max_retries + 1):
+            try:
+                b = self.db.batch()
+                for ref, doc in writes:
+                    b.set(ref, doc)
+                b.commit()
+                self.stats["commits"] += 1
+                self._unavailable = False
+                return True
+            except Exception:
+                if attempt == self.max_retries or self._closing:
+                    break
+                self.stats["retries"] += 1
+                delay = min(self.max_backoff, self.backoff * (2 ** attempt))
+                time.sleep(delay * (0.5 + random.random() / 2))
+        self._unavailable = True
+        return False
+
+    def _document(self, rec, replayed):
+        doc = {f: rec.get(f) for f in RECORD_FIELDS}
+        ts = rec.get("timestamp")
+        if isinstance(ts, str):
+            try:
+                ts = datetime.fromisoformat(ts)
+            except ValueError:
+                ts = None
+        if isinstance(ts, datetime) and ts.tzinfo is None:
+            ts = ts.replace(tzinfo=timezone.utc)
+        ts = ts or datetime.now(timezone.utc)
+        if replayed:
+            doc["client_timestamp"] = ts
+            doc["timestamp"] = self.server_timestamp if self.server_timestamp is not None else datetime.now(timezone.utc)
+        else:
+            doc["timestamp"] = self.server_timestamp if self.server_timestamp is not None else ts
+        return doc
+
+    # ---------------- spill / replay ----------------
+    def _spill(self, records):
+        if self.spill is None:
+            self.stats["dropped"] += len(records)
+            return
+        self.spill.append_many(records)
+        self.spill.flush()
+        self.stats["spilled"] += len(records)
+
+    def _replay_spill(self):
+        """Commit spilled records after the replay cursor. Only one process replays at a time."""
+        self._last_replay = time.monotonic()
+        if self.spill is None:
+            return
+        cursor_path = os.path.join(self.spill.directory, "replay.cursor")
+        with open(os.path.join(self.spill.directory, "replay.lock"), "a") as lock:
+            if fcntl:
+                try:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    return
+            try:
+                cursor = int(open(cursor_path).read()) if os.path.exists(cursor_path) else 0
+            except ValueError:
+                cursor = 0
+            replayed = 0
+            while not self._closing:
+                records, new_cursor = self.spill.read_since(cursor, max_records=self.max_batch)
+                if not records or not self._commit_with_retry(records, replayed=True):
+                    break
+                cursor = new_cursor
+                tmp = cursor_path + ".tmp"
+                with open(tmp, "w") as f:
+                    f.write(str(cursor))
+                os.replace(tmp, cursor_path)
+                self.stats["replayed"] += len(records)
+                replayed += len(records)
+            if replayed:
+                # Committed and past the persisted cursor: the spill keeps only what is still pending.
+                self.spill.drop_before(cursor)
@@ -2,34 +2,50 @@
 """
 - Top tabs: Products | Live Analytics | Chatbot
 - Sidebar filters + mood
-- Save product -> Firestore (optional) OR local_product_clicks.json (fallback)
+- Save product -> Firestore (optional) OR local append-only interaction log (fallback)
 - Live Analytics reads saved interactions
 """
 
 import streamlit as st
-import pandas as pd
 import numpy as np
 import os
-import json
+import atexit
+import html
 from datetime import datetime
-import plotly.graph_objects as go
 
-# Try optional firebase-admin import
-FIREBASE_AVAILABLE = False
-try:
-    import firebase_admin
-    from firebase_admin import credentials, firestore
-    FIREBASE_AVAILABLE = True
-except Exception:
-    FIREBASE_AVAILABLE = False
-    
-# Try optional openai import
-OPENAI_AVAILABLE = False
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-except Exception:
-    OPENAI_AVAILABLE = False
+from beauty.brand_stats import load_or_build_brand_stats, price_tier
+from beauty.cache import resources
+from beauty.catalog import SKIN_TYPES, load_catalog
+from beauty.aggregates import AggregateStore
+from beauty.export import (EXPORT_PART_RECORDS, FORMATS as EXPORT_FORMATS, date_bounds, export_part, part_count,
+                           part_file_name)
+from beauty.frame import InteractionFrame
+from beauty.firestore_sync import FirestoreMirror
+from beauty.ingredients import load_or_build_index
+from beauty.intents import IntentMatcher, ResponseCache, normalize_query
+from beauty.interaction_db import InteractionDB
+from beauty.interaction_log import InteractionLog
+from beauty.lazy import is_installed, lazy_import, settled_imports
+from beauty.llm import LLMBackend, build_messages
+from beauty.rollups import TimeSeriesRollup
+from beauty.scorer import Scorer
+from beauty.tracing import tracer
+from beauty.write_behind import WriteBehindQueue
+
+# Heavy libraries load on first use: the catalog is parsed without pandas, so pandas
+# loads only when Live Analytics (or the admin timings panel) renders.
+pd = lazy_import("pandas")
+go = lazy_import("plotly.graph_objects")
+
+# Optional backends are only imported once they are actually configured.
+FIREBASE_AVAILABLE = is_installed("firebase_admin")
+OPENAI_AVAILABLE = is_installed("openai")
+PARQUET_AVAILABLE = is_installed("pyarrow")
+
+# Per-section timings (admin panel + Prometheus text); off unless BEAUTY_TRACING=1.
+tracer.enabled = os.environ.get("BEAUTY_TRACING") == "1"
+tracer.export_path = os.environ.get("BEAUTY_TRACE_FILE")
+tracer.begin_rerun()
 
 
 # ---------------- Page config ----------------
@@ -49,6 +65,7 @@ st.markdown(
     /* Content text color */
     .stApp { color: #e9eef5; }
     /* Pink product card (light text adjusted for contrast) */
+    .product-grid { display:grid; grid-template-columns:repeat(auto-fill, minmax(300px, 1fr)); gap:18px; }
     .product-card {
         background: linear-gradient(180deg, #ffe9ef 0%, #ffe6eb 100%);
         border-radius: 14px;
@@ -68,52 +85,210 @@ st.markdown(
 )
 
 # ---------------- Sample / real data setup ----------------
-brands = ["The Ordinary", "Clinique", "Laneige", "Drunk Elephant", "Briogeo"]
-avg_interest = [57.8, 43.7, 26.1, 10.2, 4.8]
-forecast_values = [1369.9, 1475.1, 1399.9, 1386.5, 1417.1]
-
-products = {
-    "The Ordinary": {
-        "Oily": {"name": "Niacinamide 10% + Zinc 1%", "price": 650, "desc": "Balances sebum and clears acne.", "img": ""},
-        "Dry": {"name": "Hyaluronic Acid 2% + B5", "price": 750, "desc": "Hydrates dry, dull skin deeply.", "img": ""},
-        "Combination": {"name": "Salicylic Acid 2% Masque", "price": 850, "desc": "Exfoliates and decongests pores.", "img": ""},
-        "Sensitive": {"name": "Squalane Cleanser", "price": 900, "desc": "Gentle cleanser for sensitive skin.", "img": ""},
-        "Normal": {"name": "Multi-Peptide Serum", "price": 1200, "desc": "General skin-strengthening serum.", "img": ""},
-    },
-    "Clinique": {
-        "Sensitive": {"name": "Moisture Surge 100H Hydrator", "price": 3900, "desc": "Calms & hydrates sensitive skin.", "img": ""},
-        "Normal": {"name": "Even Better Clinical", "price": 4200, "desc": "Brightening & evening serum.", "img": ""},
-    },
-    "Laneige": {
-        "Dry": {"name": "Water Sleeping Mask EX", "price": 2400, "desc": "Overnight hydration for dry skin.", "img": ""},
-        "Normal": {"name": "Lip Sleeping Mask", "price": 1200, "desc": "Hydrating lip treatment.", "img": ""},
-    },
-    "Drunk Elephant": {
-        "Combination": {"name": "Protini Polypeptide Cream", "price": 5600, "desc": "Protein-rich moisturizer for balance.", "img": ""},
-        "Normal": {"name": "C-Firma Day Serum", "price": 4200, "desc": "Vitamin C antioxidant serum.", "img": ""},
-    },
-    "Briogeo": {
-        "Dry": {"name": "Don't Despair, Repair!", "price": 3600, "desc": "Nourishing mask for dry hair & scalp.", "img": ""},
-        "Combination": {"name": "Scalp Revival", "price": 2200, "desc": "Scalp treatment for flakiness.", "img": ""},
-    }
-}
+CATALOG_PATH = os.environ.get(
+    "BEAUTY_CATALOG_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "product_info_skincare.csv"),
+)
+PRODUCTS_PER_PAGE = 12
+DATA_DIR = os.environ.get("BEAUTY_DATA_DIR", "beauty_data")
+# Optional OpenAI-compatible endpoint for chatbot answers (e.g. `python -m beauty.llm stub`).
+LLM_URL = os.environ.get("BEAUTY_LLM_URL")
+LLM_MODEL = os.environ.get("BEAUTY_LLM_MODEL", "gpt-4o-mini")
+LLM_TIMEOUT = float(os.environ.get("BEAUTY_LLM_TIMEOUT", "2.0"))
+LEGACY_LOCAL_FILE = "local_product_clicks.json"
+# Operator-only sidebar panels (cache invalidation, section timings); never shown to ordinary visitors.
+ADMIN = os.environ.get("BEAUTY_ADMIN") == "1"
+
+DEFAULT_BRANDS = ["The Ordinary", "CLINIQUE", "LANEIGE", "Drunk Elephant", "Briogeo"]
+
 
-brand_data = {
-    "The Ordinary": {"price": "Budget", "best_for": "Oily"},
-    "Clinique": {"price": "Mid-range", "best_for": "Sensitive"},
-    "Laneige": {"price": "Mid-range", "best_for": "Dry"},
-    "Drunk Elephant": {"price": "Luxury", "best_for": "Combination"},
-    "Briogeo": {"price": "Mid-range", "best_for": "Dry"},
-}
+def _release(method):
+    """Cache dispose hook: run the value's atexit-registered `method` now and drop the registration."""
+    def dispose(value):
+        bound = getattr(value, method)
+        atexit.unregister(bound)
+        bound()
+    return dispose
 
-def extract_price(p_val):
-    """Safely extracts the integer price from a product dictionary value."""
-    return int(p_val)
+
+@resources.memoize("catalog")
+def load_product_catalog(path):
+    """Parses the product CSV once per process into a columnar Catalog."""
+    return load_catalog(path)
+
+
+@resources.memoize("interaction_store", dispose=_release("close"))
+def open_interaction_store(data_dir):
+    """
+    Process-wide handle on the local SQLite interaction store, shared with every other
+    dashboard process using the same BEAUTY_DATA_DIR (earlier NDJSON logs are imported once).
+    """
+    store = InteractionDB(os.path.join(data_dir, "interactions.sqlite"))
+    store.import_legacy(os.path.join(data_dir, "interactions"), LEGACY_LOCAL_FILE)
+    atexit.register(store.close)
+    return store
+
+
+@resources.memoize("aggregates", dispose=_release("save"))
+def open_aggregates(data_dir):
+    """Process-wide aggregate counters, restored from their snapshot and caught up from the store."""
+    agg = AggregateStore(os.path.join(data_dir, "local_aggregates.json"))
+    agg.catch_up(open_interaction_store(data_dir))
+    atexit.register(agg.save)
+    return agg
+
+
+@resources.memoize("rollups", dispose=_release("save"))
+def open_rollups(data_dir):
+    """Hourly/daily per-brand and per-product series over the local store, updated incrementally."""
+    rollup = TimeSeriesRollup(os.path.join(data_dir, "local_rollups.npz"))
+    rollup.catch_up(open_interaction_store(data_dir))
+    atexit.register(rollup.save)
+    return rollup
+
+
+@resources.memoize("interaction_frame")
+def open_interaction_frame(data_dir):
+    """Dictionary-encoded columns over the local store, shared read-only by every session."""
+    frame = InteractionFrame()
+    frame.catch_up(open_interaction_store(data_dir))
+    return frame
+
+
+@resources.memoize("firestore_mirror")
+def open_firestore_mirror(data_dir, _db):
+    """Local SQLite mirror of product_clicks; each sync only reads documents newer than the last one."""
+    os.makedirs(data_dir, exist_ok=True)
+    return FirestoreMirror(_db, os.path.join(data_dir, "firestore_mirror.sqlite"))
+
+
+@resources.memoize("firestore_aggregates", dispose=_release("save"))
+def open_firestore_aggregates(data_dir, _db):
+    """Aggregate counters over the Firestore mirror (separate snapshot from the local log's)."""
+    agg = AggregateStore(os.path.join(data_dir, "firestore_aggregates.json"))
+    agg.catch_up(open_firestore_mirror(data_dir, _db))
+    atexit.register(agg.save)
+    return agg
+
+
+@resources.memoize("firestore_rollups", dispose=_release("save"))
+def open_firestore_rollups(data_dir, _db):
+    """Time-series rollups over the Firestore mirror."""
+    rollup = TimeSeriesRollup(os.path.join(data_dir, "firestore_rollups.npz"))
+    rollup.catch_up(open_firestore_mirror(data_dir, _db))
+    atexit.register(rollup.save)
+    return rollup
+
+
+@resources.memoize("firestore_frame")
+def open_firestore_frame(data_dir, _db):
+    """Dictionary-encoded columns over the Firestore mirror."""
+    frame = InteractionFrame()
+    frame.catch_up(open_firestore_mirror(data_dir, _db))
+    return frame
+
+
+@resources.memoize("firestore_writer", dispose=_release("close"))
+def open_firestore_writer(data_dir, _db):
+    """Process-wide write-behind queue that batches save clicks into Firestore commits."""
+    spill = InteractionLog(os.path.join(data_dir, "firestore_spill"))
+    server_timestamp = None
+    if FIREBASE_AVAILABLE:
+        from firebase_admin import firestore
+        server_timestamp = firestore.SERVER_TIMESTAMP
+    writer = WriteBehindQueue(_db, spill=spill, server_timestamp=server_timestamp)
+    atexit.register(writer.close)
+    return writer
+
+
+# Everything derived from the catalog is keyed on its digest (and keeps one version), so
+# reloading a changed CSV rebuilds them instead of pairing new data with old arrays.
+@resources.memoize("brand_stats", max_entries=1)
+def load_brand_stats(path, digest):
+    """Per-brand totals (loves, reviews, rating, price tier), cached on disk per CSV version."""
+    return load_or_build_brand_stats(load_product_catalog(path), os.path.join(DATA_DIR, "cache"))
+
+
+@resources.memoize("interest_figure", max_entries=64)
+def interest_figure(selected, digest):
+    """Brand popularity (total loves) bar chart for a brand selection (a tuple, so it can key the cache)."""
+    fig = go.Figure()
+    for i, c in enumerate(brand_stats.codes(selected)):
+        b = brand_stats.brand_names[c]
+        fig.add_trace(go.Bar(x=[b], y=[int(brand_stats.loves[c])], name=b,
+                             marker=dict(color=["#ff7fa6","#ffb3c1","#ffd0e0","#ffc1b6","#fcd7e0"][i%5])))
+    fig.update_layout(template="plotly_dark", height=380, showlegend=False,
+                      margin=dict(l=10,r=10,t=40,b=10))
+    return fig
+
+
+def trend_figure(rollup, brand_names, days=30, horizon=7):
+    """Daily saves for the given brands over the last `days` days, with the dashed forecast after."""
+    keys, fc_start, fc = rollup.forecast("brand", "daily", horizon)
+    _, start, counts = rollup.series("brand", "daily", fc_start - days, fc_start + 1)
+    row = {k: i for i, k in enumerate(keys)}
+    to_date = lambda day: datetime.utcfromtimestamp(day * 86400).date()
+    past = [to_date(d) for d in range(start, fc_start + 1)]
+    future = [to_date(d) for d in range(fc_start, fc_start + horizon)]
+    colors = ["#ff7fa6", "#ffb3c1", "#ffd0e0", "#ffc1b6", "#fcd7e0"]
+    fig = go.Figure()
+    for i, b in enumerate(brand_names):
+        if b not in row:
+            continue
+        color = colors[i % len(colors)]
+        fig.add_trace(go.Scatter(x=past, y=counts[row[b]], name=b, mode="lines+markers", line=dict(color=color)))
+        fig.add_trace(go.Scatter(x=future, y=fc[row[b]].round(1), name=f"{b} (forecast)", mode="lines",
+                                 line=dict(color=color, dash="dash"), showlegend=False))
+    fig.update_layout(template="plotly_dark", height=350, margin=dict(l=10, r=10, t=30, b=30))
+    return fig
+
+
+@resources.memoize("ingredient_index", max_entries=1)
+def load_ingredient_index(path, digest):
+    """Ingredient -> product bitmap index, memory-mapped from DATA_DIR/cache (built on first use per CSV version)."""
+    return load_or_build_index(path, os.path.join(DATA_DIR, "cache"), digest)
+
+
+@resources.memoize("scorer", max_entries=1)
+def load_scorer(path, digest):
+    """Recommendation scorer with the catalog's static features precomputed."""
+    return Scorer(load_product_catalog(path))
+
+
+@resources.memoize("intent_matcher", max_entries=1)
+def load_intent_matcher(path, digest):
+    """Chatbot phrase automaton over the catalog's brands, skin types, categories and ingredient names."""
+    return IntentMatcher.from_catalog(load_product_catalog(path), SKIN_TYPES, load_ingredient_index(path, digest).names)
+
+
+@resources.memoize("chat_responses")
+def open_response_cache():
+    """Chatbot answers shared by all sessions, keyed on question, skin type, price bracket, mood and filters."""
+    return ResponseCache(max_entries=1024, ttl=300.0)
+
+
+@resources.memoize("llm_backend", dispose=_release("close"))
+def open_llm_backend(base_url, model, _api_key):
+    """Background completion client; identical in-flight questions share one request."""
+    backend = LLMBackend(base_url, _api_key, model, timeout=LLM_TIMEOUT)
+    atexit.register(backend.close)
+    return backend
+
+
+with tracer.span("catalog"):
+    catalog = load_product_catalog(CATALOG_PATH)
+    scorer = load_scorer(CATALOG_PATH, catalog.digest)
+    brand_stats = load_brand_stats(CATALOG_PATH, catalog.digest)
 
 # ---------------- Sidebar (filters + nav fallback) ----------------
+sidebar_span = tracer.start("sidebar")
 st.sidebar.header("Filters & Settings")
-selected_brands = st.sidebar.multiselect("Select brands:", options=brands, default=brands)
-skin_type = st.sidebar.selectbox("Skin type:", ["Oily", "Dry", "Combination", "Sensitive", "Normal"])
+selected_brands = st.sidebar.multiselect(
+    "Select brands:",
+    options=brand_stats.by_popularity(),
+    default=[b for b in DEFAULT_BRANDS if len(brand_stats.codes([b]))],
+)
+skin_type = st.sidebar.selectbox("Skin type:", SKIN_TYPES)
 price_min, price_max = st.sidebar.slider(
     "💰 Price range (₹):",
     min_value=0,
@@ -122,296 +297,373 @@ price_min, price_max = st.sidebar.slider(
     step=100
 )
 
+ingredients_in = st.sidebar.text_input("🧪 Contains ingredients:", placeholder="e.g. niacinamide, hyaluronic acid")
+ingredients_out = st.sidebar.text_input("🚫 Excludes ingredients:", placeholder="e.g. fragrance, alcohol denat")
+
+ingredient_mask = None
+contains = tuple(q.strip() for q in ingredients_in.split(",") if q.strip())
+excludes = tuple(q.strip() for q in ingredients_out.split(",") if q.strip())
+if contains or excludes:
+    ingredient_mask, unknown_ingredients = load_ingredient_index(CATALOG_PATH, catalog.digest).mask(contains, excludes)
+    if unknown_ingredients:
+        st.sidebar.caption(f"No product lists: {', '.join(unknown_ingredients)}")
+
 mood = st.sidebar.radio("Chatbot mood:", ["Sweet 💖", "Savage 😈", "Professional 💼"], index=2)
+tracer.stop(sidebar_span)
 
 
 # --- CRITICAL CHANGE: SECRETS AND FIREBASE INITIALIZATION ---
 
-db = None
-firebase_ready = False
+@resources.memoize("firestore")
+def connect_firestore():
+    """
+    Builds the Firestore client once per process.
+    Returns (db or None, (sidebar level, message)); raises if initialisation fails so it is retried.
+    """
+    if not FIREBASE_AVAILABLE:
+        return None, ("info", "Install 'firebase-admin' for live saving (optional).")
+    import firebase_admin
+    from firebase_admin import credentials, firestore
 
-if FIREBASE_AVAILABLE:
-    
     # 1. Try to load from Streamlit Secrets (for deployment) using individual keys
     if "FIREBASE_PROJECT_ID" in st.secrets:
-        try:
-            # Reconstruct the Firebase JSON dictionary from individual Streamlit secrets
-            key_dict = {
-                "type": st.secrets["FIREBASE_TYPE"],
-                "project_id": st.secrets["FIREBASE_PROJECT_ID"],
-                "private_key_id": st.secrets["FIREBASE_PRIVATE_KEY_ID"],
-                # Reading the full private key string
-                "private_key": st.secrets["FIREBASE_PRIVATE_KEY"], 
-                "client_email": st.secrets["FIREBASE_CLIENT_EMAIL"],
-                "client_id": st.secrets["FIREBASE_CLIENT_ID"],
-                "auth_uri": st.secrets["FIREBASE_AUTH_URI"],
-                "token_uri": st.secrets["FIREBASE_TOKEN_URI"],
-                "auth_provider_x509_cert_url": st.secrets["FIREBASE_AUTH_PROVIDER_X509_CERT_URL"],
-                "client_x509_cert_url": st.secrets["FIREBASE_CLIENT_X509_CERT_URL"],
-                "universe_domain": st.secrets["FIREBASE_UNIVERSE_DOMAIN"]
-            }
-            
-            cred = credentials.Certificate(key_dict)
-            if not firebase_admin._apps:
-                firebase_admin.initialize_app(cred)
-            db = firestore.client()
-            firebase_ready = True
-            st.sidebar.success("Firestore (Live Saving) **Enabled** via Streamlit Secrets (Robust).")
-        except Exception as e:
-            st.sidebar.error(f"Firestore Init Failed (Secret Rebuild): {e}")
-            firebase_ready = False
-            
+        source = "Secret Rebuild"
+        # Reconstruct the Firebase JSON dictionary from individual Streamlit secrets
+        cred_source = {
+            "type": st.secrets["FIREBASE_TYPE"],
+            "project_id": st.secrets["FIREBASE_PROJECT_ID"],
+            "private_key_id": st.secrets["FIREBASE_PRIVATE_KEY_ID"],
+            # Reading the full private key string
+            "private_key": st.secrets["FIREBASE_PRIVATE_KEY"],
+            "client_email": st.secrets["FIREBASE_CLIENT_EMAIL"],
+            "client_id": st.secrets["FIREBASE_CLIENT_ID"],
+            "auth_uri": st.secrets["FIREBASE_AUTH_URI"],
+            "token_uri": st.secrets["FIREBASE_TOKEN_URI"],
+            "auth_provider_x509_cert_url": st.secrets["FIREBASE_AUTH_PROVIDER_X509_CERT_URL"],
+            "client_x509_cert_url": st.secrets["FIREBASE_CLIENT_X509_CERT_URL"],
+            "universe_domain": st.secrets["FIREBASE_UNIVERSE_DOMAIN"]
+        }
+        status = ("success", "Firestore (Live Saving) **Enabled** via Streamlit Secrets (Robust).")
+
     # 2. Fallback to local file (for local testing only)
     elif os.path.exists("firebase-key.json"):
-        try:
-            cred = credentials.Certificate("firebase-key.json")
-            if not firebase_admin._apps:
-                firebase_admin.initialize_app(cred)
-            db = firestore.client()
-            firebase_ready = True
-            st.sidebar.info("Firestore (Live Saving) **Enabled** via local file.")
-        except Exception as e:
-            st.sidebar.error(f"Firestore Init Failed (Local File): {e}")
-            firebase_ready = False
-            
+        source = "Local File"
+        cred_source = "firebase-key.json"
+        status = ("info", "Firestore (Live Saving) **Enabled** via local file.")
+
     else:
-        st.sidebar.info("Firestore key not found. Live saving disabled (using local JSON fallback).")
-else:
-    st.sidebar.info("Install 'firebase-admin' for live saving (optional).")
+        return None, ("info", "Firestore key not found. Live saving disabled (using local log fallback).")
 
+    try:
+        cred = credentials.Certificate(cred_source)
+        if not firebase_admin._apps:
+            firebase_admin.initialize_app(cred)
+        return firestore.client(), status
+    except Exception as e:
+        raise RuntimeError(f"Firestore Init Failed ({source}): {e}") from e
+
+
+@resources.memoize("openai_key")
+def load_openai_key():
+    """Returns (key or None, sidebar status or None)."""
+    if OPENAI_AVAILABLE and "OPENAI_API_KEY" in st.secrets:
+        return st.secrets["OPENAI_API_KEY"], ("success", "OpenAI Key Found.")
+    elif OPENAI_AVAILABLE:
+        return None, ("warning", "OpenAI key not found in secrets. Chatbot is rule-based only.")
+    return None, None
+
+
+try:
+    with tracer.span("firestore_init"):
+        db, firestore_status = connect_firestore()
+except Exception as e:
+    db, firestore_status = None, ("error", str(e))
+firebase_ready = db is not None
+getattr(st.sidebar, firestore_status[0])(firestore_status[1])
 
 # OpenAI Key Setup 
-OPENAI_KEY = None
-if OPENAI_AVAILABLE and "OPENAI_API_KEY" in st.secrets:
-    OPENAI_KEY = st.secrets["OPENAI_API_KEY"]
-    st.sidebar.success("OpenAI Key Found.")
-elif OPENAI_AVAILABLE:
-    st.sidebar.warning("OpenAI key not found in secrets. Chatbot is rule-based only.")
+OPENAI_KEY, openai_status = load_openai_key()
+if openai_status:
+    getattr(st.sidebar, openai_status[0])(openai_status[1])
+
+if ADMIN:
+    with st.sidebar.expander("⚙️ Cached resources"):
+        cache_target = st.selectbox("Invalidate:", ["All"] + resources.namespaces)
+        if st.button("Clear cache"):
+            resources.invalidate(None if cache_target == "All" else cache_target)
+            st.rerun()
 
 
 # ---------------- Top tabs for navigation ----------------
-tab_products, tab_analytics, tab_chat = st.tabs(["💄 Products", "📊 Live Analytics", "💬 Chatbot"])
+TAB_LABELS = ["💄 Products", "📊 Live Analytics", "💬 Chatbot"]
+try:
+    # Only the selected tab's body runs, so its imports and data loads happen on first visit.
+    tab_products, tab_analytics, tab_chat = st.tabs(TAB_LABELS, key="main_tab", on_change="rerun")
+except TypeError:  # older Streamlit without lazy tabs: every tab body runs
+    tab_products, tab_analytics, tab_chat = st.tabs(TAB_LABELS)
+
+
+def tab_is_open(tab):
+    return getattr(tab, "open", True) is not False
 
 # --------------------- PRODUCTS TAB ---------------------
-with tab_products:
-    st.markdown("<h1 style='color:#f4f6f9; font-weight:800;'>Beauty Brand Insights</h1>", unsafe_allow_html=True)
-    st.markdown("Explore data-driven product matches, quick insights, and save items for analysis.")
-
-    c1, c2 = st.columns([1.2, 1])
-
-    with c1:
-        st.subheader("Average Search Interest (simulated)")
-        fig_interest = go.Figure()
-        for i, b in enumerate(selected_brands):
-            if b in brands:
-                fig_interest.add_trace(go.Bar(x=[b], y=[avg_interest[brands.index(b)]], name=b,
-                                              marker=dict(color=["#ff7fa6","#ffb3c1","#ffd0e0","#ffc1b6","#fcd7e0"][i%5])))
-        fig_interest.update_layout(template="plotly_dark", height=380, showlegend=False,
-                                   margin=dict(l=10,r=10,t=40,b=10))
-        st.plotly_chart(fig_interest, use_container_width=True)
-
-    with c2:
-        st.subheader("Best Matches for your filters")
-        matches = []
-        for b in selected_brands:
-            for sk, p in products.get(b, {}).items():
-                price_val = extract_price(p["price"]) 
-                if sk == skin_type and price_min <= price_val <= price_max:
-                    matches.append(b)
-                    break 
-
-        if matches:
-            st.success(f"💅 Best matches for **{skin_type}** skin in ₹{price_min}–₹{price_max} range: **{', '.join(sorted(list(set(matches))))}**")
-        else:
-            st.info("No exact match — try adjusting filters. (The Ordinary is a versatile option.)")
-
-    st.markdown("---")
-    st.header("Personalized Product Recommendations")
-
-    any_shown = False
-    for brand in selected_brands:
-        if brand in products and skin_type in products[brand]:
-            any_shown = True
-            p = products[brand][skin_type]
-            
-            price_val = extract_price(p['price'])
-            if not (price_min <= price_val <= price_max):
-                continue
-
-            st.markdown(
+if tab_is_open(tab_products):
+    with tab_products, tracer.span("products"):
+        st.markdown("<h1 style='color:#f4f6f9; font-weight:800;'>Beauty Brand Insights</h1>", unsafe_allow_html=True)
+        st.markdown("Explore data-driven product matches, quick insights, and save items for analysis.")
+
+        candidate_mask = catalog.filter_mask(selected_brands, mask=ingredient_mask)
+        exact_mask = catalog.filter_mask(skin_type=skin_type, price_min=price_min, price_max=price_max, mask=candidate_mask)
+        matched_rows = np.flatnonzero(exact_mask)
+
+        c1, c2 = st.columns([1.2, 1])
+
+        with c1:
+            st.subheader("Brand Popularity (total loves)")
+            # Drawn before pandas is loaded: wait out another session's pandas import (plotly probes for it).
+            with settled_imports():
+                fig_interest = interest_figure(tuple(selected_brands), catalog.digest)
+                st.plotly_chart(fig_interest, use_container_width=True)
+
+        with c2:
+            st.subheader("Best Matches for your filters")
+            if len(matched_rows):
+                st.success(f"💅 Best matches for **{skin_type}** skin in ₹{price_min}–₹{price_max} range: **{', '.join(catalog.brands_of(matched_rows))}**")
+            else:
+                st.info("No exact match — try adjusting filters. (The Ordinary is a versatile option.)")
+
+        st.markdown("---")
+        st.header("Personalized Product Recommendations")
+
+        # Whole-catalog ranking (skin fit, rating, loves, reviews, price distance), one keyset page at a time:
+        # a rerun renders one HTML block and a fixed handful of widgets however many products match.
+        # Only exact matches are ranked; with none, the closest products of the chosen brands are shown instead.
+        grid_filters = (tuple(selected_brands), skin_type, price_min, price_max, contains, excludes)
+        grid = st.session_state.get("product_grid")
+        if grid is None or grid["filters"] != grid_filters:
+            grid = st.session_state["product_grid"] = {"filters": grid_filters, "cursors": [None]}
+        ranked_mask = exact_mask if len(matched_rows) else candidate_mask
+        page_rows, next_cursor = scorer.page(PRODUCTS_PER_PAGE, skin_type, price_min, price_max,
+                                             ranked_mask, after=grid["cursors"][-1])
+        page_no = len(grid["cursors"])
+        if len(matched_rows):
+            st.caption(f"Page {page_no} · {len(matched_rows):,} products match your filters, best first.")
+        elif len(page_rows):
+            st.info("No product matches every filter. Showing the closest products from your selected brands "
+                    "(outside your skin type or price range).")
+            st.caption(f"Page {page_no} of the closest alternatives.")
+
+        cards = []
+        for row in page_rows:
+            p = catalog.row(row)
+            cards.append(
                 f"""<div class="product-card">
-                        <div class="product-title">{p['name']}</div>
-                        <div class="product-desc">{p['desc']}</div>
-                        <div class="product-meta">💰 Price: ₹{p['price']} &nbsp;&nbsp; 🌸 Skin: {skin_type} &nbsp;&nbsp; 🏷️ Brand: {brand}</div>
-                    </div>""",
-                unsafe_allow_html=True
+                        <div class="product-title">{html.escape(p['name'])}</div>
+                        <div class="product-desc">{html.escape(p['category'])} · {html.escape(p['subcategory'])} · ⭐ {p['rating']:.1f} ({p['reviews']} reviews)</div>
+                        <div class="product-meta">💰 Price: ₹{int(round(p['price']))} &nbsp;&nbsp; 🌸 Skin: {', '.join(p['skin_types']) or 'All types'} &nbsp;&nbsp; 🏷️ Brand: {html.escape(p['brand'])}</div>
+                    </div>"""
             )
-            
-            save_key = f"save_{brand}_{p['name'].replace(' ', '_')}"
-            if st.button(f"💗 Save {p['name']}", key=save_key):
-                
-                if price_val < 1000:
-                    price_range_desc = "Budget"
-                elif price_val < 4000:
-                    price_range_desc = "Mid-range"
-                else:
-                    price_range_desc = "Luxury"
-
+        if cards:
+            st.markdown(f'<div class="product-grid">{"".join(cards)}</div>', unsafe_allow_html=True)
+
+        def turn_page(cursor):
+            cursors = st.session_state["product_grid"]["cursors"]
+            if cursor is None:
+                if len(cursors) > 1:
+                    cursors.pop()
+            else:
+                cursors.append(cursor)
+
+        def save_product(skin):
+            """on_click of the single Save button: record the product picked on this page."""
+            row = st.session_state.get("save_choice")
+            if row is None:
+                return
+            with tracer.span("products.save"):
+                p = catalog.row(row)
+                price_val = int(round(p["price"]))
                 rec = {
-                    "brand": brand,
+                    "brand": p["brand"],
                     "product_name": p['name'],
-                    "skin_type": skin_type,
-                    "price_range": price_range_desc,
-                    "price_value": p['price'],
+                    "skin_type": skin,
+                    "price_range": price_tier(price_val),
+                    "price_value": price_val,
                     "timestamp": datetime.utcnow().isoformat()
                 }
-                
+
                 if firebase_ready and db:
                     try:
-                        db.collection("product_clicks").document().set({
-                            "brand": rec["brand"],
-                            "product_name": rec["product_name"],
-                            "skin_type": rec["skin_type"],
-                            "price_range": rec["price_range"],
-                            "price_value": rec["price_value"],
-                            "timestamp": firestore.SERVER_TIMESTAMP
-                        })
-                        st.success(f"Saved to Firestore: {p['name']}")
+                        # Committed in batches by a background thread; the click does not wait on the network.
+                        if open_firestore_writer(DATA_DIR, db).submit(rec):
+                            status = ("success", f"Saved to Firestore: {p['name']}")
+                        else:
+                            status = ("warning", f"Firestore unavailable — saved locally, will sync later: {p['name']}")
                     except Exception as e:
-                        st.error(f"Firestore save error: {e}")
+                        status = ("error", f"Firestore save error: {e}")
                 else:
-                    # Fallback to local JSON file
-                    local_file = "local_product_clicks.json"
+                    # Fallback to the local store shared by this host's dashboard processes
                     try:
-                        if os.path.exists(local_file):
-                            with open(local_file, "r", encoding="utf-8") as f:
-                                data = json.load(f)
-                        else:
-                            data = []
-                    except Exception:
-                        data = []
-                        
-                    data.append(rec)
-                    # NOTE: Local file will not persist across Cloud sessions!
-                    with open(local_file, "w", encoding="utf-8") as f:
-                        json.dump(data, f, ensure_ascii=False, indent=2)
-                    st.success(f"Saved locally: {p['name']} (Note: Local file may not persist on Cloud deployment)")
-
-    if not any_shown:
-        st.info("No product found for these filters. Try different skin type / brands / price range.")
-
-    st.markdown("---")
-    st.subheader("Insights Summary")
-    sel_interest = [avg_interest[brands.index(b)] for b in selected_brands if b in brands] if selected_brands else []
-    
-    if sel_interest:
-        max_interest = max(sel_interest)
-        min_interest = min(sel_interest)
-        top_b_index = [brands.index(b) for b in selected_brands if b in brands and avg_interest[brands.index(b)] == max_interest][0]
-        low_b_index = [brands.index(b) for b in selected_brands if b in brands and avg_interest[brands.index(b)] == min_interest][0]
-        
-        top_b = brands[top_b_index]
-        low_b = brands[low_b_index]
-
-        st.markdown(f"- 🌟 **{top_b}** leads in popularity (score **{max_interest}**).")
-        st.markdown(f"- 💧 **{low_b}** shows the lowest interest (score **{min_interest}**).")
-        st.markdown("- 📌 Consumers prefer performance & transparency over price for skincare products.")
-    else:
-        st.warning("Select brands to compute insights.")
+                        store = open_interaction_store(DATA_DIR)
+                        store.append(rec)
+                        open_aggregates(DATA_DIR).catch_up(store)
+                        # NOTE: Local store will not persist across Cloud sessions!
+                        status = ("success", f"Saved locally: {p['name']} (Note: Local file may not persist on Cloud deployment)")
+                    except Exception as e:
+                        status = ("error", f"Local save error: {e}")
+            st.session_state["save_status"] = status
+
+        if len(page_rows):
+            s1, s2, s3, s4 = st.columns([3, 1, 1, 1])
+            s1.selectbox("Save a product from this page:", [int(r) for r in page_rows],
+                         format_func=lambda r: f"{catalog.name[r]} ({catalog.brand_names[catalog.brand_code[r]]})",
+                         key="save_choice", label_visibility="collapsed")
+            s2.button("💗 Save", on_click=save_product, args=(skin_type,), use_container_width=True)
+            s3.button("← Previous", on_click=turn_page, args=(None,), disabled=page_no == 1, use_container_width=True)
+            s4.button("Next →", on_click=turn_page, args=(next_cursor,), disabled=next_cursor is None,
+                      use_container_width=True)
+        save_status = st.session_state.pop("save_status", None)
+        if save_status:
+            getattr(st, save_status[0])(save_status[1])
+
+        if not len(page_rows):
+            st.info("No product found for these filters. Try different skin type / brands / price range.")
+
+        st.markdown("---")
+        st.subheader("Insights Summary")
+        extremes = brand_stats.leader_and_laggard(selected_brands)
+
+        if extremes:
+            top_c, low_c = extremes
+            st.markdown(f"- 🌟 **{brand_stats.brand_names[top_c]}** leads in popularity "
+                        f"(**{brand_stats.loves[top_c]:,}** loves across {brand_stats.products[top_c]} products, "
+                        f"avg rating {brand_stats.rating_mean[top_c]:.2f}).")
+            st.markdown(f"- 💧 **{brand_stats.brand_names[low_c]}** shows the lowest interest "
+                        f"(**{brand_stats.loves[low_c]:,}** loves, {brand_stats.reviews[low_c]:,} reviews).")
+            st.markdown("- 📌 Consumers prefer performance & transparency over price for skincare products.")
+        else:
+            st.warning("Select brands to compute insights.")
 
 # --------------------- LIVE ANALYTICS TAB ---------------------
-with tab_analytics:
-    st.header("Live Analytics — Saved Interactions")
-
-    records = []
-    if firebase_ready and db:
-        try:
-            docs = db.collection("product_clicks").order_by("timestamp", direction=firestore.Query.DESCENDING).limit(1000).stream()
-            for d in docs:
-                r = d.to_dict()
-                ts = r.get("timestamp")
-                if ts and hasattr(ts, 'isoformat'):
-                     r["timestamp"] = ts.isoformat()
-                elif ts and hasattr(ts, 'strftime'):
-                     r["timestamp"] = ts.strftime("%Y-%m-%dT%H:%M:%S")
-                records.append(r)
-            st.success(f"Loaded {len(records)} records from Firestore.")
-        except Exception as e:
-            st.error(f"Error reading Firestore: {e}")
-            records = []
-    else:
-        local_file = "local_product_clicks.json"
-        if os.path.exists(local_file):
+if tab_is_open(tab_analytics):
+    with tab_analytics:
+        st.header("Live Analytics — Saved Interactions")
+
+        load_span = tracer.start("analytics.load")
+        agg = None
+        export_source = None
+        if firebase_ready and db:
             try:
-                with open(local_file, "r", encoding="utf-8") as f:
-                    records = json.load(f)
-                st.info(f"Loaded {len(records)} records from local JSON fallback.")
+                mirror = open_firestore_mirror(DATA_DIR, db)
+                with tracer.span("analytics.firestore_sync"):
+                    new_docs = mirror.sync()
+                agg = open_firestore_aggregates(DATA_DIR, db)
+                agg.catch_up(mirror)
+                rollup = open_firestore_rollups(DATA_DIR, db)
+                rollup.catch_up(mirror)
+                frame = open_firestore_frame(DATA_DIR, db)
+                frame.catch_up(mirror)
+                export_source = mirror
+                st.success(f"Loaded {agg.total} records from Firestore ({new_docs} new since last sync).")
             except Exception as e:
-                st.error(f"Failed to read local log: {e}")
-                records = []
-        else:
-            st.info("No saved interactions yet. Use the Products tab to save items (saved locally if Firestore not configured).")
-            records = []
-
-    if records:
-        df_rec = pd.DataFrame(records)
-        
-        if "timestamp" in df_rec.columns:
-            df_rec["timestamp"] = pd.to_datetime(df_rec["timestamp"], errors='coerce')
-        
-        prod_counts = df_rec["product_name"].value_counts().reset_index()
-        prod_counts.columns = ["product_name", "count"]
-
-        brand_counts = df_rec["brand"].value_counts().reset_index()
-        brand_counts.columns = ["brand", "count"]
-
-        skin_counts = df_rec["skin_type"].value_counts().reset_index()
-        skin_counts.columns = ["skin_type", "count"]
-
-        a1, a2 = st.columns(2)
-        with a1:
-            st.subheader("Most Saved Products")
-            fig_p = go.Figure(go.Bar(x=prod_counts["count"].iloc[:10][::-1],
-                                     y=prod_counts["product_name"].iloc[:10][::-1],
-                                     orientation="h",
-                                     marker=dict(color="#ffb3c1")))
-            fig_p.update_layout(template="plotly_dark", height=350, margin=dict(l=120, r=10, t=30, b=30))
-            st.plotly_chart(fig_p, use_container_width=True)
-            st.write(prod_counts.head(10))
-
-        with a2:
-            st.subheader("Most Popular Brands")
-            fig_b = go.Figure(go.Bar(x=brand_counts["brand"], y=brand_counts["count"], marker=dict(color="#ff7fa6")))
-            fig_b.update_layout(template="plotly_dark", height=350, margin=dict(l=10, r=10, t=30, b=30))
-            st.plotly_chart(fig_b, use_container_width=True)
-            st.write(brand_counts.head(10))
-
-        st.subheader("Top Skin Type Preferences")
-        fig_s = go.Figure(go.Bar(x=skin_counts["skin_type"], y=skin_counts["count"], marker=dict(color="#ffc6d6")))
-        fig_s.update_layout(template="plotly_dark", height=300, margin=dict(t=10))
-        st.plotly_chart(fig_s, use_container_width=True)
-        st.write(skin_counts)
-
-        csv = df_rec.to_csv(index=False).encode("utf-8")
-        st.download_button(label="📥 Download saved interactions (CSV)", data=csv, file_name="saved_interactions.csv", mime="text/csv")
-
-        st.markdown("---")
-        st.subheader("Recent Saved Interactions")
-        if "timestamp" in df_rec.columns:
-            st.dataframe(df_rec.sort_values(by="timestamp", ascending=False).head(100), use_container_width=True)
+                st.error(f"Error reading Firestore: {e}")
+                agg = None
         else:
-            st.dataframe(df_rec.head(100), use_container_width=True)
+            try:
+                store = open_interaction_store(DATA_DIR)
+                agg = open_aggregates(DATA_DIR)
+                agg.catch_up(store)
+                rollup = open_rollups(DATA_DIR)
+                rollup.catch_up(store)
+                frame = open_interaction_frame(DATA_DIR)
+                frame.catch_up(store)
+                export_source = store
+                if agg.total:
+                    st.info(f"Loaded {agg.total} records from the local interaction store.")
+                else:
+                    st.info("No saved interactions yet. Use the Products tab to save items (saved locally if Firestore not configured).")
+            except Exception as e:
+                st.error(f"Failed to read local store: {e}")
+                agg = None
+        tracer.stop(load_span)
+
+        render_span = tracer.start("analytics.render")
+        if agg is not None and agg.total:
+            prod_counts = pd.DataFrame(agg.top("product_name", 10), columns=["product_name", "count"])
+            brand_counts = pd.DataFrame(agg.top("brand", 20), columns=["brand", "count"])
+            skin_counts = pd.DataFrame(agg.top("skin_type", 10), columns=["skin_type", "count"])
+
+            a1, a2 = st.columns(2)
+            with a1:
+                st.subheader("Most Saved Products")
+                fig_p = go.Figure(go.Bar(x=prod_counts["count"][::-1],
+                                         y=prod_counts["product_name"][::-1],
+                                         orientation="h",
+                                         marker=dict(color="#ffb3c1")))
+                fig_p.update_layout(template="plotly_dark", height=350, margin=dict(l=120, r=10, t=30, b=30))
+                st.plotly_chart(fig_p, use_container_width=True)
+                st.write(prod_counts)
+
+            with a2:
+                st.subheader("Most Popular Brands")
+                fig_b = go.Figure(go.Bar(x=brand_counts["brand"], y=brand_counts["count"], marker=dict(color="#ff7fa6")))
+                fig_b.update_layout(template="plotly_dark", height=350, margin=dict(l=10, r=10, t=30, b=30))
+                st.plotly_chart(fig_b, use_container_width=True)
+                st.write(brand_counts.head(10))
+
+            st.subheader("Top Skin Type Preferences")
+            fig_s = go.Figure(go.Bar(x=skin_counts["skin_type"], y=skin_counts["count"], marker=dict(color="#ffc6d6")))
+            fig_s.update_layout(template="plotly_dark", height=300, margin=dict(t=10))
+            st.plotly_chart(fig_s, use_container_width=True)
+            st.write(skin_counts)
+
+            st.subheader("Daily Saves & 7-Day Forecast (top brands)")
+            st.plotly_chart(trend_figure(rollup, [b for b, _ in agg.top("brand", 5)]), use_container_width=True)
+
+            with st.expander("📥 Export saved interactions"):
+                formats = [f for f in EXPORT_FORMATS if f != "parquet" or PARQUET_AVAILABLE]
+                e1, e2, e3 = st.columns(3)
+                export_fmt = e1.selectbox("Format", formats, key="export_format")
+                export_dates = e2.date_input("Date range", value=(), key="export_dates")
+                export_brands = e3.multiselect("Brands", sorted(agg.keys("brand")), key="export_brands")
+                since, until = (tuple(export_dates) + (None, None))[:2]
+                file_name, mime = EXPORT_FORMATS[export_fmt]
+                if hasattr(export_source, "query_chunks"):  # indexed count from the local store
+                    matching = export_source.count(*date_bounds(since, until or since), export_brands or None)
+                    st.caption(f"{matching:,} saved interactions match.")
+                else:  # the mirror has no filtered count; the whole history bounds it
+                    matching = agg.total
+                # Streamlit holds a download in memory, so each one is capped at EXPORT_PART_RECORDS.
+                parts = part_count(matching)
+                part = 0
+                if parts > 1:
+                    part = st.number_input(f"Part (oldest first, {EXPORT_PART_RECORDS:,} records each)",
+                                           min_value=1, max_value=parts, value=1, key="export_part") - 1
+                # Encoded in chunks through a temp file only when the button is clicked, not on every rerun.
+                st.download_button(label=f"📥 Download saved interactions ({export_fmt})",
+                                   data=lambda: export_part(export_source, export_fmt, since, until or since,
+                                                            export_brands, part),
+                                   file_name=part_file_name(file_name, part, parts), mime=mime)
+
+            st.markdown("---")
+            st.subheader("Recent Saved Interactions")
+            snapshot = frame.snapshot()
+            st.dataframe(snapshot.tail(100), use_container_width=True)
+            st.caption(f"{len(snapshot):,} interactions held in {snapshot.nbytes / 2**20:.1f} MB of columns.")
+        tracer.stop(render_span)
 
 # --------------------- CHATBOT TAB ---------------------
-with tab_chat:
-    st.header("Beauty Insights Assistant")
-    st.markdown("Ask quick questions about trends, recommendations, or product picks. (Offline rule-based bot)")
+if tab_is_open(tab_chat):
+    with tab_chat, tracer.span("chatbot"):
+        st.header("Beauty Insights Assistant")
+        llm_url = LLM_URL or ("https://api.openai.com/v1" if OPENAI_KEY else None)
+        st.markdown("Ask quick questions about trends, recommendations, or product picks."
+                    + (" (Answers phrased by an LLM, rule-based fallback)" if llm_url else " (Offline rule-based bot)"))
 
-    q = st.text_input("Ask a question (e.g., 'best for oily skin', 'forecast', 'popular brand')")
+        q = st.text_input("Ask a question (e.g., 'best for oily skin', 'forecast', 'popular brand')")
+
+        MOOD_PERSONAS = {"Sweet 💖": "sweet and encouraging", "Savage 😈": "playfully savage",
+                         "Professional 💼": "professional"}
 
-    def chatbot_answer(query, mood, skin):
-        
-        current_price_range = ""
         if price_max < 1500:
             current_price_range = "Budget"
         elif price_max < 4500:
@@ -419,44 +671,109 @@ with tab_chat:
         else:
             current_price_range = "Luxury"
 
-        if not query:
-            return "Ask me something about product recommendations, trends, or pricing."
-            
-        qq = query.lower()
-        
-        # --- Start of AI Integration Placeholder ---
-        # You can add logic here to use the OPENAI_KEY if you want a smarter bot:
-        # if OPENAI_KEY and (query suggests using AI):
-        #    import openai
-        #    client = openai.OpenAI(api_key=OPENAI_KEY)
-        #    ai_resp = client.chat.completions.create(...)
-        #    return ai_resp.choices[0].message.content
-        # --- End of AI Integration Placeholder ---
-        
-        if "trend" in qq or "popular" in qq:
-            resp = f"The Ordinary and Clinique show consistently high interest in our dataset. The Ordinary is strong among budget buyers."
-        elif "forecast" in qq:
-            resp = "Forecast models predict steady interest into early 2026 for ingredient-driven brands (simulated)."
-        elif "recommend" in qq or "best" in qq:
-            candidates = [b for b in brands if brand_data[b]["best_for"] == skin and brand_data[b]["price"] == current_price_range]
-            
-            if not candidates:
-                 candidates = [b for b in brands if brand_data[b]["best_for"] == skin]
-
-            resp = f"Recommended for **{skin}** skin in the **{current_price_range}** price bracket: **{', '.join(candidates)}**." if candidates else "No exact match with current filters; consider The Ordinary for versatility."
-            
-        elif "price" in qq:
-            resp = "Budget: The Ordinary | Mid-range: Clinique, Laneige, Briogeo | Luxury: Drunk Elephant"
-        else:
-            resp = "Try: 'best for dry skin', 'popular brands', or 'forecast'."
-
-        if mood == "Sweet 💖":
-            return "💖 " + resp + " You're glowing already!"
-        if mood == "Savage 😈":
-            return "😈 " + resp + " Do better or buy better."
-        return "💼 " + resp
+        def rule_answer(found, skin):
+            """Answer text for the intent and entities extracted from the question."""
+            intent = found.intent
+            if intent is None and (found.skin_types or found.categories or found.ingredients
+                                   or found.excluded_ingredients):
+                intent = "recommend"  # e.g. "niacinamide serum for oily skin", "anything fragrance free?"
 
-    if q:
-        st.info(chatbot_answer(q, mood, skin_type)) 
-    else:
-        st.caption("Type a question and press Enter to get an answer.")
+            if intent == "trend":
+                return f"The Ordinary and Clinique show consistently high interest in our dataset. The Ordinary is strong among budget buyers."
+            if intent == "forecast":
+                if firebase_ready and db:
+                    rollup = open_firestore_rollups(DATA_DIR, db)
+                    rollup.catch_up(open_firestore_mirror(DATA_DIR, db))
+                else:
+                    rollup = open_rollups(DATA_DIR)
+                    rollup.catch_up(open_interaction_store(DATA_DIR))
+                keys, _, fc = rollup.forecast("brand", "daily", 7)
+                totals = fc.sum(axis=1)
+                order = [i for i in np.argsort(-totals) if not found.brands or keys[i] in found.brands]
+                ranked = [(keys[i], totals[i]) for i in order[:3] if totals[i] >= 0.5]
+                if ranked:
+                    return "Next 7 days (from saved interactions): " + ", ".join(f"**{b}** ~{t:.0f} saves" for b, t in ranked) + "."
+                return "Not enough saved interactions yet to forecast — save a few products first."
+            if intent == "recommend":
+                skin = found.skin_types[0] if found.skin_types else skin
+                mask = ingredient_mask
+                if found.ingredients or found.excluded_ingredients:
+                    named, _ = load_ingredient_index(CATALOG_PATH, catalog.digest).mask(
+                        found.ingredients, found.excluded_ingredients)
+                    mask = named if mask is None else mask & named
+                # Picks stay inside the sidebar price range, so the bracket named in the answer holds.
+                mask = catalog.filter_mask(found.brands or selected_brands, price_min=price_min, price_max=price_max,
+                                           mask=mask)
+                if found.categories:
+                    codes = [i for i, c in enumerate(catalog.category_names) if c in found.categories]
+                    mask &= np.isin(catalog.category_code, codes) | np.isin(catalog.subcategory, found.categories)
+                picks = [catalog.row(r) for r in scorer.top_k(3, skin, price_min, price_max, mask)]
+                candidates = [f"{p['name']} ({p['brand']}, ₹{p['price']:.0f})" for p in picks]
+                if candidates:
+                    return f"Recommended for **{skin}** skin in the **{current_price_range}** price bracket: **{', '.join(candidates)}**."
+                return "No exact match with current filters; consider The Ordinary for versatility."
+            if intent == "price":
+                tiers = brand_stats.by_tier(found.brands or selected_brands)
+                return " | ".join(f"{tier}: {', '.join(names)}" for tier, names in tiers.items() if names) or "Select brands to compare price tiers."
+            return "Try: 'best for dry skin', 'popular brands', or 'forecast'."
+
+        def chatbot_answer(query, mood, skin):
+            """(answer, note): cached per question/skin/bracket/mood/filters; LLM-phrased when configured."""
+            if not query:
+                return "Ask me something about product recommendations, trends, or pricing.", None
+            key = (normalize_query(query), skin, current_price_range, mood,
+                   tuple(selected_brands), price_min, price_max, contains, excludes)
+            cache = open_response_cache()
+            answer = cache.get(key)
+            if answer is not None:
+                return answer, None
+
+            resp = rule_answer(load_intent_matcher(CATALOG_PATH, catalog.digest).match(query), skin)
+            if llm_url:
+                text, from_llm = open_llm_backend(llm_url, LLM_MODEL, OPENAI_KEY).ask(
+                    key, build_messages(query, resp, MOOD_PERSONAS[mood]), resp)
+                if from_llm:
+                    answer = mood.split()[-1] + " " + text
+                    cache.set(key, answer)
+                    return answer, None
+                note = "The language model did not answer in time; showing the rule-based answer."
+            else:
+                note = None
+
+            if mood == "Sweet 💖":
+                answer = "💖 " + resp + " You're glowing already!"
+            elif mood == "Savage 😈":
+                answer = "😈 " + resp + " Do better or buy better."
+            else:
+                answer = "💼 " + resp
+            if note is None:
+                cache.set(key, answer)  # a timed-out LLM answer is picked up on the next ask instead
+            return answer, note
+
+        if q:
+            answer, note = chatbot_answer(q, mood, skin_type)
+            st.info(answer)
+            if note:
+                st.caption(note)
+        else:
+            st.caption("Type a question and press Enter to get an answer.")
+
+# --------------------- ADMIN: SECTION TIMINGS ---------------------
+if ADMIN and tracer.enabled:
+    with st.sidebar.expander("⏱️ Section timings"):
+        timings = tracer.summary()
+        if timings:
+            st.dataframe(pd.DataFrame(timings).round(2), hide_index=True, use_container_width=True)
+        slow = tracer.slowest()
+        if slow:
+            st.caption("Slowest reruns")
+            st.dataframe(pd.DataFrame([
+                {"ms": round(total * 1000), "at": datetime.fromtimestamp(at).strftime("%H:%M:%S"),
+                 "sections": ", ".join(f"{k} {v * 1000:.0f}" for k, v in sorted(sections.items(), key=lambda kv: -kv[1])[:4])}
+                for total, at, sections in slow[:10]
+            ]), hide_index=True, use_container_width=True)
+        st.download_button("Prometheus metrics", data=tracer.prometheus, file_name="beauty_metrics.prom", mime="text/plain")
+        if st.button("Reset timings"):
+            tracer.reset()
+
+tracer.end_rerun()
@@ -0,0 +1,66 @@
+"""
+Memory of saved interactions: list of dicts / object DataFrame vs InteractionFrame.
+
+Records are written to the SQLite interaction store the app uses; the frame
+is built from it with column reads, as the app builds it.
+
+    python benchmarks/frame_benchmark.py --records 1000000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+
+from beauty.frame import InteractionFrame  # noqa: E402
+from beauty.interaction_db import InteractionDB  # noqa: E402
+from beauty.synthetic import synthetic_catalog, synthetic_interactions  # noqa: E402
+
+
+def mb(n_bytes):
+    return n_bytes / 2**20
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--products", type=int, default=20_000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = InteractionDB(os.path.join(tmp, "interactions.sqlite"))
+        for chunk in synthetic_interactions(synthetic_catalog(args.products), args.records):
+            store.append_many(chunk)
+
+        tracemalloc.start()
+        records, _ = store.read_since(0)
+        records_mb = mb(tracemalloc.get_traced_memory()[0])
+        tracemalloc.stop()
+        df = pd.DataFrame(records)
+        df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
+        dict_mb = mb(df.memory_usage(deep=True).sum())
+        del records, df
+
+        t0 = time.perf_counter()
+        frame = InteractionFrame()
+        frame.catch_up(store)
+        snapshot = frame.snapshot()
+        frame_s = time.perf_counter() - t0
+        cat_mb = mb(snapshot.to_pandas().memory_usage(deep=True).sum())
+        store.close()
+
+    print(f"{'representation':<28} {'MB':>8} {'build s':>8}")
+    print(f"{'list of dicts':<28} {records_mb:>8.1f} {'':>8}")
+    print(f"{'object-dtype DataFrame':<28} {dict_mb:>8.1f} {'':>8}")
+    print(f"{'InteractionFrame columns':<28} {mb(snapshot.nbytes):>8.1f} {frame_s:>8.1f}")
+    print(f"{'categorical DataFrame':<28} {cat_mb:>8.1f} {'':>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""
+Load and rerun benchmark for beauty_dashboard_app.py.
+
+For each configuration (catalog rows x log rows x Firestore mode) a synthetic
+interaction history is written to a fresh data directory (or, with --firestore,
+into the product_clicks collection the dashboard mirrors), then N concurrent
+AppTest sessions, each in its own interpreter with the same synthetic catalog
+injected into the app's resource cache, change filters, switch tabs, ask the
+chatbot, page through the product grid and click Save. Reports rerun latency percentiles per tab, save
+throughput and peak RSS as JSON, and optionally compares against a previous
+run (exit status 1 on regressions or session errors).
+
+    python benchmarks/load_benchmark.py --rows 10000 100000 --log-rows 100000 \\
+        --sessions 8 --actions 25 --firestore fake --json load.json --compare baseline.json
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from beauty.catalog import SKIN_TYPES  # noqa: E402
+
+APP = os.path.join(ROOT, "beauty_dashboard_app.py")
+SYNTHETIC_CATALOG_PATH = "synthetic-catalog.csv"  # never read: the catalog is primed into the cache
+TABS = {"products": "💄 Products", "analytics": "📊 Live Analytics", "chatbot": "💬 Chatbot"}
+ACTIONS = ("skin", "brands", "price", "page", "save", "analytics", "chatbot")
+PERCENTILES = (50, 90, 99)
+CHAT_QUESTIONS = ("best for dry skin", "forecast", "popular brands", "price tiers")
+
+
+# ---------------- worker: one session in its own interpreter ----------------
+# AppTest installs a process-global Streamlit runtime for each run, so sessions
+# cannot share an interpreter; they share the data directory (interaction store, snapshots)
+# as several server processes would.
+def _widget(elements, label):
+    return next(w for w in elements if w.label == label)
+
+
+def _prime(args):
+    """Inject the synthetic catalog (and Firestore client) into the app's resource cache."""
+    from beauty.cache import resources
+    from beauty.firestore_fake import FakeFirestore
+    from beauty.intents import IntentMatcher
+    from beauty.synthetic import synthetic_catalog
+
+    catalog = synthetic_catalog(args.rows, seed=args.seed)
+    resources.prime("catalog", catalog, path=SYNTHETIC_CATALOG_PATH)
+    # No ingredient lists in the synthetic catalog: the chatbot matches brands, skin types and categories only.
+    resources.prime("intent_matcher", IntentMatcher.from_catalog(catalog, SKIN_TYPES),
+                    path=SYNTHETIC_CATALOG_PATH, digest=catalog.digest)
+    db = None
+    if args.firestore == "fake":
+        # In-process, so every worker seeds its own copy of the history (same ids, so the
+        # shared mirror sees one history); saves get per-session ids.
+        db = FakeFirestore(id_prefix=f"s{args.session}-")
+        seed_firestore(db, catalog, args.log_rows, args)
+    elif args.firestore == "emulator":
+        # google-cloud-firestore talks to the emulator when FIRESTORE_EMULATOR_HOST is set
+        from google.cloud import firestore
+        db = firestore.Client(project=os.environ.get("GCLOUD_PROJECT", "beauty-benchmark"))
+    if db is not None:
+        resources.prime("firestore", (db, ("success", f"Firestore {args.firestore} (benchmark)")))
+    counts = np.bincount(catalog.brand_code, minlength=len(catalog.brand_names))
+    return [catalog.brand_names[i] for i in np.argsort(-counts)[:8]]
+
+
+def _wait_for_peers(ready_dir, session, sessions):
+    open(os.path.join(ready_dir, str(session)), "w").close()
+    while len(os.listdir(ready_dir)) < sessions:
+        time.sleep(0.005)
+
+
+def _run_session(at, args, brands, rng, timings):
+    def timed(action, tab):
+        at.session_state["main_tab"] = TABS[tab]
+        t0 = time.perf_counter()
+        at.run()
+        timings.append((action, tab, time.perf_counter() - t0))
+        if at.exception:
+            raise RuntimeError(f"{action}: {at.exception[0].message}")
+
+    # Synthetic brand names never match the app's default selection: pick some first.
+    _widget(at.sidebar.multiselect, "Select brands:").set_value(brands[:5])
+    timed("brands", "products")
+    for _ in range(args.actions):
+        action = rng.choice(ACTIONS)
+        tab = "products"
+        if action == "skin":
+            _widget(at.sidebar.selectbox, "Skin type:").set_value(rng.choice(SKIN_TYPES))
+        elif action == "brands":
+            _widget(at.sidebar.multiselect, "Select brands:").set_value(rng.sample(brands, rng.randint(1, len(brands))))
+        elif action == "price":
+            lo = rng.randrange(0, 3000, 100)
+            _widget(at.sidebar.slider, "💰 Price range (₹):").set_value((lo, rng.randrange(lo + 100, 6100, 100)))
+        elif action in ("page", "save"):
+            if not any(b.label == "💗 Save" for b in at.button):
+                timed("products", "products")
+            if not any(b.label == "💗 Save" for b in at.button):
+                continue
+            if action == "page":
+                forward = [b for b in at.button if b.label == "Next →" and not b.disabled]
+                (forward or [b for b in at.button if b.label == "← Previous"])[0].click()
+            else:
+                choice = at.selectbox(key="save_choice")
+                choice.select_index(rng.randrange(len(choice.options)))
+                timed("pick", "products")
+                _widget(at.button, "💗 Save").click()
+        elif action == "analytics":
+            tab = "analytics"
+        elif action == "chatbot":
+            if not any(t.label.startswith("Ask") for t in at.text_input):
+                timed("chatbot_open", "chatbot")
+            next(t for t in at.text_input if t.label.startswith("Ask")).set_value(rng.choice(CHAT_QUESTIONS))
+            tab = "chatbot"
+        timed(action, tab)
+
+
+def worker(args):
+    from streamlit.testing.v1 import AppTest
+
+    os.environ["BEAUTY_DATA_DIR"] = args.data_dir
+    os.environ["BEAUTY_CATALOG_PATH"] = SYNTHETIC_CATALOG_PATH
+    brands = _prime(args)
+    rng = random.Random(args.seed * 1000 + args.session)
+    timings, errors = [], []
+    _wait_for_peers(os.path.join(args.data_dir, "ready"), args.session, args.sessions)
+    t_start = time.perf_counter()
+    try:
+        t0 = time.perf_counter()
+        at = AppTest.from_file(APP, default_timeout=600).run()
+        timings.append(("first_paint", "products", time.perf_counter() - t0))
+        if at.exception:
+            raise RuntimeError(f"first paint: {at.exception[0].message}")
+        _run_session(at, args, brands, rng, timings)
+    except Exception as e:  # report what was measured before the failure
+        errors.append(f"{type(e).__name__}: {e}")
+    wall = time.perf_counter() - t_start
+
+    firestore = None
+    if args.firestore != "none":
+        from beauty.cache import MISSING, resources
+        writer = resources.backend.get(("firestore_writer", ("data_dir", args.data_dir)))
+        firestore = {}
+        if writer is not MISSING:
+            writer.flush(timeout=60)
+            firestore = dict(writer.stats)
+        db, _ = resources.backend.get(("firestore",))
+        if hasattr(db, "reads"):  # FakeFirestore counts billed document reads
+            firestore["reads"] = db.reads
+    print(json.dumps({
+        "timings": timings,
+        "errors": errors,
+        "wall_s": wall,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "firestore": firestore,
+    }))
+
+
+# ---------------- parent: configurations, report, comparison ----------------
+def _percentiles(values):
+    if not values:
+        return {}
+    arr = np.array(values) * 1000
+    out = {f"p{p}_ms": float(np.percentile(arr, p)) for p in PERCENTILES}
+    out.update(count=len(values), mean_ms=float(arr.mean()), max_ms=float(arr.max()))
+    return out
+
+
+def seed_firestore(db, catalog, log_rows, args, collection="product_clicks"):
+    """Commit the synthetic history as documents with fixed ids and stored (datetime) timestamps."""
+    from beauty.synthetic import synthetic_interactions
+
+    coll = db.collection(collection)
+    i = 0
+    for chunk in synthetic_interactions(catalog, log_rows, seed=args.seed, chunk_records=500, end=args.history_end):
+        batch = db.batch()
+        for rec in chunk:
+            ts = datetime.fromisoformat(rec["timestamp"]).replace(tzinfo=timezone.utc)
+            batch.set(coll.document(f"seed{i:012d}"), dict(rec, timestamp=ts))
+            i += 1
+        batch.commit()
+
+
+def write_history(data_dir, args, rows, log_rows):
+    """Seconds spent writing the history the dashboard will read (fake Firestore: seeded by each worker)."""
+    from beauty.interaction_db import InteractionDB
+    from beauty.synthetic import synthetic_catalog, synthetic_interactions
+
+    t0 = time.perf_counter()
+    catalog = synthetic_catalog(rows, seed=args.seed)
+    if args.firestore == "emulator":
+        from google.cloud import firestore
+        seed_firestore(firestore.Client(project=os.environ.get("GCLOUD_PROJECT", "beauty-benchmark")),
+                       catalog, log_rows, args)
+    elif args.firestore == "none":
+        store = InteractionDB(os.path.join(data_dir, "interactions.sqlite"))
+        for chunk in synthetic_interactions(catalog, log_rows, seed=args.seed, end=args.history_end):
+            store.append_many(chunk)
+        store.close()
+    return time.perf_counter() - t0
+
+
+def run_config(args, rows, log_rows):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    with tempfile.TemporaryDirectory() as data_dir:
+        os.makedirs(os.path.join(data_dir, "ready"))
+        history_s = write_history(data_dir, args, rows, log_rows)
+        procs = [
+            subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), "--worker", "--data-dir", data_dir,
+                 "--session", str(i), "--sessions", str(args.sessions), "--rows", str(rows),
+                 "--actions", str(args.actions), "--firestore", args.firestore, "--seed", str(args.seed),
+                 "--log-rows", str(log_rows), "--history-end", str(args.history_end)],
+                cwd=data_dir, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+            )
+            for i in range(args.sessions)
+        ]
+        outputs = [p.communicate() for p in procs]
+    sessions = []
+    for p, (out, err) in zip(procs, outputs):
+        if p.returncode != 0:
+            raise SystemExit(f"benchmark worker failed for rows={rows}, log_rows={log_rows}:\n{err[-4000:]}")
+        sessions.append(json.loads(out.strip().splitlines()[-1]))
+
+    timings = [tuple(t) for s in sessions for t in s["timings"]]
+    wall = max(s["wall_s"] for s in sessions)
+    saves = sum(1 for a, _, _ in timings if a == "save")
+    firestore = None
+    if any(s["firestore"] for s in sessions):
+        firestore = {k: sum((s["firestore"] or {}).get(k, 0) for s in sessions)
+                     for k in ("committed", "commits", "retries", "spilled", "dropped", "reads")}
+    return {
+        "config": {"rows": rows, "log_rows": log_rows, "sessions": args.sessions, "actions": args.actions,
+                   "firestore": args.firestore, "seed": args.seed},
+        "setup": {"history_write_s": history_s},
+        "wall_s": wall,
+        "reruns": len(timings),
+        "reruns_per_s": len(timings) / wall if wall else 0.0,
+        "saves": saves,
+        "saves_per_s": saves / wall if wall else 0.0,
+        "tabs": {tab: _percentiles([t for a, tb, t in timings if tb == tab and a != "first_paint"]) for tab in TABS},
+        "actions": {a: _percentiles([t for b, _, t in timings if b == a]) for a in ("first_paint", "pick") + ACTIONS},
+        "peak_rss_mb": max(s["peak_rss_mb"] for s in sessions),
+        "total_rss_mb": sum(s["peak_rss_mb"] for s in sessions),
+        "firestore": firestore,
+        "errors": [e for s in sessions for e in s["errors"]][:20],
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Regressions of p90 rerun latency per tab (or peak RSS) beyond `tolerance` versus a baseline file."""
+    def key(r):
+        c = r["config"]
+        return (c["rows"], c["log_rows"], c["sessions"], c["firestore"])
+
+    previous = {key(r): r for r in baseline.get("results", [])}
+    regressions = []
+    for r in results:
+        old = previous.get(key(r))
+        if old is None:
+            continue
+        for tab, stats in r["tabs"].items():
+            before, after = old["tabs"].get(tab, {}).get("p90_ms"), stats.get("p90_ms")
+            if before and after and after > before * (1 + tolerance):
+                regressions.append(f"{key(r)} {tab} p90 {before:.0f} -> {after:.0f} ms")
+        if r["peak_rss_mb"] > old["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(f"{key(r)} peak RSS {old['peak_rss_mb']:.0f} -> {r['peak_rss_mb']:.0f} MB")
+    return regressions
+
+
+def report(r):
+    c = r["config"]
+    print(f"\ncatalog {c['rows']:,} rows, log {c['log_rows']:,} rows, {c['sessions']} sessions x {c['actions']} actions, "
+          f"firestore={c['firestore']}")
+    first = r["actions"]["first_paint"]
+    print(f"  history write {r['setup']['history_write_s']:.1f} s; first paint p50 {first.get('p50_ms', 0):.0f} ms; "
+          f"peak RSS {r['peak_rss_mb']:.0f} MB per session ({r['total_rss_mb']:.0f} MB total)")
+    print(f"  {r['reruns']} reruns in {r['wall_s']:.1f} s ({r['reruns_per_s']:.1f}/s), "
+          f"{r['saves']} saves ({r['saves_per_s']:.2f}/s)")
+    for tab, s in r["tabs"].items():
+        if s:
+            print(f"  {tab:<10} " + "  ".join(f"p{p} {s[f'p{p}_ms']:7.0f} ms" for p in PERCENTILES) + f"  (n={s['count']})")
+    if r["firestore"]:
+        fs = r["firestore"]
+        print(f"  firestore: {fs['committed']} committed in {fs['commits']} commits, {fs['spilled']} spilled"
+              + (f", {fs['reads']} document reads" if fs["reads"] else ""))
+    for e in r["errors"]:
+        print(f"  error: {e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000], help="synthetic catalog sizes")
+    parser.add_argument("--log-rows", type=int, nargs="+", default=[10_000], help="synthetic interaction history sizes")
+    parser.add_argument("--sessions", type=int, default=4)
+    parser.add_argument("--actions", type=int, default=20, help="actions per session")
+    parser.add_argument("--firestore", choices=["none", "fake", "emulator"], default="none")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", help="previous --json output to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown for --compare")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--data-dir", help=argparse.SUPPRESS)
+    parser.add_argument("--session", type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument("--history-end", type=float, default=time.time(), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.worker:
+        args.rows, args.log_rows = args.rows[0], args.log_rows[0]
+        return worker(args)
+    if args.firestore == "emulator" and not os.environ.get("FIRESTORE_EMULATOR_HOST"):
+        parser.error("--firestore emulator needs FIRESTORE_EMULATOR_HOST")
+
+    results = []
+    for rows in args.rows:
+        for log_rows in args.log_rows:
+            results.append(run_config(args, rows, log_rows))
+            report(results[-1])
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results}, f, indent=2)
+    failed = any(r["errors"] for r in results)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION: {line}", file=sys.stderr)
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""
+Top-k recommendation latency at 10k / 100k / 1M catalog rows.
+
+    python benchmarks/scorer_benchmark.py --sizes 10000 100000 1000000 --k 12
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from beauty.scorer import Scorer  # noqa: E402
+from beauty.synthetic import synthetic_catalog  # noqa: E402
+
+
+def time_ms(fn, repeat):
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--k", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    print(f"{'rows':>10} {'setup ms':>9} {'top-k p50':>10} {'top-k max':>10} {'filtered p50':>13}")
+    for n in args.sizes:
+        catalog = synthetic_catalog(n)
+        t0 = time.perf_counter()
+        scorer = Scorer(catalog)
+        setup = (time.perf_counter() - t0) * 1000
+        brands = catalog.brand_names[:20]
+        p50, worst = time_ms(lambda: scorer.top_k(args.k, "Dry", 500, 4000), args.repeat)
+        fp50, _ = time_ms(lambda: scorer.top_k(args.k, "Dry", 500, 4000, catalog.filter_mask(brands)), args.repeat)
+        print(f"{n:>10} {setup:>9.1f} {p50:>10.2f} {worst:>10.2f} {fp50:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Startup-time budget for beauty_dashboard_app.py.
+
+Every sample runs in a fresh interpreter with an empty data directory: it
+imports Streamlit, then times the app's first AppTest render (cold imports,
+catalog load, sidebar and the default tab, i.e. time-to-first-paint) and one
+warm rerun. Exits with status 1 when the median first paint exceeds the budget
+or a module in DEFERRED_MODULES was loaded before first paint.
+
+    python benchmarks/startup_benchmark.py --samples 5 --budget-ms 1000 --json startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "beauty_dashboard_app.py")
+WATCHED_MODULES = ["pandas", "plotly", "firebase_admin", "openai", "pyarrow"]
+# Never needed for the default tab: loading one at first paint is a regression.
+DEFERRED_MODULES = ["pandas", "pyarrow"]
+
+
+def child():
+    t0 = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    t1 = time.perf_counter()
+    at = AppTest.from_file(APP, default_timeout=120).run()
+    t2 = time.perf_counter()
+    if at.exception:
+        raise SystemExit(f"app raised: {at.exception}")
+    at.run()
+    t3 = time.perf_counter()
+    print(json.dumps({
+        "streamlit_import_ms": (t1 - t0) * 1000,
+        "first_paint_ms": (t2 - t1) * 1000,
+        "warm_rerun_ms": (t3 - t2) * 1000,
+        "loaded": [m for m in WATCHED_MODULES if m in sys.modules],
+    }))
+
+
+def sample():
+    with tempfile.TemporaryDirectory() as cwd:
+        env = dict(os.environ, BEAUTY_DATA_DIR=os.path.join(cwd, "data"),
+                   PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child"], cwd=cwd, env=env,
+                             capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--samples", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=float(os.environ.get("BEAUTY_STARTUP_BUDGET_MS", 1000)))
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        return child()
+
+    runs = [sample() for _ in range(args.samples)]
+    result = {
+        "samples": runs,
+        "median_first_paint_ms": statistics.median(r["first_paint_ms"] for r in runs),
+        "median_warm_rerun_ms": statistics.median(r["warm_rerun_ms"] for r in runs),
+        "budget_ms": args.budget_ms,
+    }
+    print(f"first paint (median of {len(runs)}): {result['median_first_paint_ms']:.0f} ms "
+          f"(budget {args.budget_ms:.0f} ms), warm rerun {result['median_warm_rerun_ms']:.0f} ms")
+    print(f"modules loaded at first paint: {', '.join(runs[-1]['loaded']) or 'none of ' + ', '.join(WATCHED_MODULES)}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    failed = False
+    if result["median_first_paint_ms"] > args.budget_ms:
+        print("FAIL: time-to-first-paint is over budget", file=sys.stderr)
+        failed = True
+    early = sorted({m for r in runs for m in r["loaded"] if m in DEFERRED_MODULES})
+    if early:
+        print(f"FAIL: {', '.join(early)} loaded before first paint", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
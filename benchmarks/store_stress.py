@@ -0,0 +1,137 @@
+"""
+Multi-process stress test for the shared SQLite interaction store.
+
+Several writer processes append uniquely numbered records (single saves and
+batches) to one InteractionDB while reader processes follow it with
+AggregateStore.catch_up and run indexed count queries. Afterwards every record
+must be present exactly once, in per-writer order, and every reader's totals
+must equal the store's. Exits 1 on any lost, duplicated or reordered write.
+
+    python benchmarks/store_stress.py --writers 8 --records 2000 --readers 2
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from beauty.aggregates import AggregateStore  # noqa: E402
+from beauty.interaction_db import InteractionDB  # noqa: E402
+
+BRANDS = [f"Brand {i}" for i in range(20)]
+
+
+def writer(path, writer_id, n_records, seed, start, timings):
+    rng = random.Random(seed * 1000 + writer_id)
+    store = InteractionDB(path)
+    start.wait()
+    t0 = time.perf_counter()
+    i = 0
+    while i < n_records:
+        batch = 1 if rng.random() < 0.7 else rng.randint(2, 25)  # mostly single clicks, some bursts
+        recs = []
+        for _ in range(min(batch, n_records - i)):
+            recs.append({
+                "brand": rng.choice(BRANDS),
+                "product_name": f"w{writer_id}-{i}",
+                "skin_type": "Dry",
+                "price_range": "Mid-range",
+                "price_value": 1000.0,
+                "timestamp": f"2026-01-{1 + i % 28:02d}T{rng.randrange(24):02d}:00:00",
+            })
+            i += 1
+        store.append_many(recs)
+    store.close()
+    timings.put(time.perf_counter() - t0)
+
+
+def reader(path, stop, start, results):
+    store = InteractionDB(path)
+    agg = AggregateStore()
+    start.wait()
+    polls = 0
+    while not stop.is_set():
+        agg.catch_up(store)
+        store.count(brands=BRANDS[:3])
+        polls += 1
+    agg.catch_up(store)
+    results.put((agg.total, dict(agg.counts["brand"]), polls))
+    store.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--records", type=int, default=2000, help="records per writer")
+    parser.add_argument("--readers", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "interactions.sqlite")
+        InteractionDB(path).close()  # create the schema before the race starts
+        start = ctx.Barrier(args.writers + args.readers + 1, timeout=120)
+        stop = ctx.Event()
+        results, timings = ctx.Queue(), ctx.Queue()
+        readers = [ctx.Process(target=reader, args=(path, stop, start, results)) for _ in range(args.readers)]
+        writers = [ctx.Process(target=writer, args=(path, w, args.records, args.seed, start, timings))
+                   for w in range(args.writers)]
+        for p in readers + writers:
+            p.start()
+        start.wait()
+        t0 = time.perf_counter()
+        for p in writers:
+            p.join()
+        wall = time.perf_counter() - t0
+        stop.set()
+        writer_s = [timings.get() for p in writers if p.exitcode == 0]
+        reader_results = [results.get() for _ in readers]
+        for p in readers:
+            p.join()
+        if len(writer_s) < len(writers):
+            print(f"{len(writers) - len(writer_s)} writer processes failed")
+            return 1
+
+        store = InteractionDB(path)
+        failures = []
+        seen = Counter()
+        last_index = {}
+        for chunk in store.iter_records(10000):
+            for rec in chunk:
+                name = rec["product_name"]
+                seen[name] += 1
+                w, i = name[1:].split("-")
+                if int(i) <= last_index.get(w, -1):
+                    failures.append(f"{name} committed out of writer order")
+                last_index[w] = int(i)
+        expected = args.writers * args.records
+        missing = sum(1 for w in range(args.writers) for i in range(args.records) if not seen[f"w{w}-{i}"])
+        duplicated = sum(c - 1 for c in seen.values() if c > 1)
+        if store.count() != expected or missing or duplicated:
+            failures.append(f"store holds {store.count()} records for {expected} writes "
+                            f"({missing} missing, {duplicated} duplicated)")
+        by_brand = store.counts_by_brand()
+        for total, counts, _ in reader_results:
+            if total != expected or counts != by_brand:
+                failures.append(f"reader saw {total} records / per-brand counts differing from the store")
+        store.close()
+
+    total_polls = sum(p for _, _, p in reader_results)
+    print(f"{args.writers} writers x {args.records} records, {args.readers} readers: "
+          f"{expected / wall:,.0f} writes/s over {wall:.2f} s (slowest writer {max(writer_s):.2f} s), "
+          f"{total_polls} reader polls")
+    for f in failures[:20]:
+        print(f"  FAIL: {f}")
+    print("OK: no lost, duplicated or reordered writes" if not failures else f"{len(failures)} failures")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
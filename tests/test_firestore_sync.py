@@ -0,0 +1,111 @@
+import threading
+import time
+from datetime import datetime, timezone
+
+from beauty.firestore_fake import SERVER_TIMESTAMP, FakeFirestore, FakeQuery
+from beauty.firestore_sync import FirestoreMirror
+
+
+def _commit(db, n, **fields):
+    coll, batch = db.collection("product_clicks"), db.batch()
+    for i in range(n):
+        batch.set(coll.document(), {"brand": "B", "product_name": f"p{i}", "timestamp": SERVER_TIMESTAMP, **fields})
+    batch.commit()
+
+
+def _mirror(db, tmp_path, **kw):
+    return FirestoreMirror(db, str(tmp_path / "mirror.sqlite"), min_interval=0, **kw)
+
+
+def test_idle_sync_does_not_reread_last_batch(tmp_path):
+    db = FakeFirestore()
+    _commit(db, 400)  # one write-behind batch: every document shares a server timestamp
+    mirror = _mirror(db, tmp_path, page_size=150)
+    assert mirror.sync() == 400
+
+    reads = db.reads
+    assert mirror.sync() == 0
+    assert db.reads - reads == 1  # an empty result is still one billed read
+
+
+def test_reads_scale_with_new_documents(tmp_path):
+    db = FakeFirestore()
+    _commit(db, 300)
+    mirror = _mirror(db, tmp_path, page_size=100)
+    mirror.sync()
+
+    _commit(db, 3)
+    reads = db.reads
+    assert mirror.sync() == 3
+    assert db.reads - reads == 3
+    assert mirror.count() == 303
+
+
+def test_pages_across_shared_timestamp_without_duplicates(tmp_path):
+    db = FakeFirestore()
+    _commit(db, 7)
+    mirror = _mirror(db, tmp_path, page_size=2)
+    assert mirror.sync() == 7
+    names = [r["product_name"] for chunk in mirror.iter_records() for r in chunk]
+    assert sorted(names) == sorted(f"p{i}" for i in range(7))
+
+
+def test_cursor_survives_reopen(tmp_path):
+    db = FakeFirestore()
+    _commit(db, 5)
+    _mirror(db, tmp_path).sync()
+
+    reopened = _mirror(db, tmp_path)
+    reads = db.reads
+    assert reopened.sync() == 0
+    assert db.reads - reads == 1
+
+
+def test_state_without_document_id_rereads_one_timestamp(tmp_path):
+    db = FakeFirestore()
+    _commit(db, 4)
+    mirror = _mirror(db, tmp_path)
+    mirror.sync()
+    mirror._conn.execute("DELETE FROM sync_state WHERE key = 'last_id'")  # as written before ids were kept
+    mirror._conn.commit()
+
+    assert mirror.sync() == 0  # the re-read batch is dropped by the doc_id constraint
+    assert mirror.count() == 4
+    assert mirror.sync() == 0 and mirror._state("last_id") is not None
+
+
+def test_client_timestamp_is_the_record_time(tmp_path):
+    db = FakeFirestore()
+    clicked = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    _commit(db, 1, client_timestamp=clicked)
+    mirror = _mirror(db, tmp_path)
+    mirror.sync()
+    (rec,), _ = mirror.read_since(0)
+    assert rec["timestamp"] == "2026-01-02T03:04:05"
+
+
+
+def test_reads_do_not_wait_for_a_sync_in_flight(tmp_path, monkeypatch):
+    db = FakeFirestore()
+    _commit(db, 3)
+    mirror = _mirror(db, tmp_path)
+    started, release = threading.Event(), threading.Event()
+    stream = FakeQuery.stream
+
+    def slow_stream(query):  # a page that takes as long as the test wants
+        started.set()
+        assert release.wait(5)
+        return stream(query)
+
+    monkeypatch.setattr(FakeQuery, "stream", slow_stream)
+    syncing = threading.Thread(target=mirror.sync)
+    syncing.start()
+    assert started.wait(5)
+    t0 = time.monotonic()
+    assert mirror.read_since(0) == ([], 0)
+    assert mirror.count() == 0
+    assert mirror.sync() == 0  # a second sync returns instead of queueing behind the first
+    assert time.monotonic() - t0 < 1.0
+    release.set()
+    syncing.join(5)
+    assert mirror.count() == 3
@@ -0,0 +1,120 @@
+import csv
+
+import numpy as np
+import pytest
+
+from beauty import ingredients
+from beauty.ingredients import IngredientIndex, load_or_build_index, normalize_ingredient
+
+PRODUCTS = [
+    "['Water, Glycerin, Niacinamide 10%, Fragrance']",
+    "['Aqua (Water), Niacinamide, Parfum']",
+    "['Eau, Glycerine, Rose Water, Natural Fragrance']",
+    "Aqua/Water/Eau, CI 77891, Zinc Oxide",
+    "",
+    "['Ingredients: Butyrospermum Parkii (Shea) Butter, Titanium Dioxide (C.I. 77891)']",
+]
+
+
+def _rows(mask):
+    return np.flatnonzero(mask).tolist()
+
+
+@pytest.fixture
+def index():
+    return IngredientIndex.build(PRODUCTS)
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("Aqua", ("water", [])),
+    ("Water (Aqua)", ("water", [])),
+    ("Aqua/Water/Eau", ("water", [])),
+    ("Parfum (Fragrance)", ("fragrance", [])),
+    ("Ingredients: Glycerine", ("glycerin", [])),
+    ("C.I. 77891", ("titanium dioxide", [])),
+    ("CI77891", ("titanium dioxide", [])),
+    ("Niacinamide 5%", ("niacinamide", [])),
+    ("Butyrospermum Parkii (Shea) Butter", ("butyrospermum parkii butter", ["shea"])),
+    ("Rose Water", ("rose water", [])),
+    ("Big Sky:", None),
+])
+def test_normalize_folds_aliases_into_one_term(raw, expected):
+    assert normalize_ingredient(raw) == expected
+
+
+def test_aliases_find_the_same_products(index):
+    for query in ("water", "aqua", "eau", "Water (Aqua)"):
+        mask, unknown = index.mask(contains=[query])
+        assert (_rows(mask), unknown) == ([0, 1, 2, 3], [])
+    assert _rows(index.mask(contains=["parfum"])[0]) == [0, 1]
+    assert _rows(index.mask(contains=["ci 77891"])[0]) == [3, 5]
+
+
+def test_contains_every_ingredient(index):
+    assert _rows(index.mask(contains=["niacinamide", "glycerin"])[0]) == [0]
+    assert _rows(index.mask(contains=["glycerine"])[0]) == [0, 2]
+
+
+def test_excludes_match_the_exact_term(index):
+    # "natural fragrance" and "rose water" are other ingredients, not fragrance or water.
+    assert _rows(index.mask(contains=["water"], excludes=["fragrance"])[0]) == [2, 3]
+    assert _rows(index.mask(excludes=["parfum"])[0]) == [2, 3, 4, 5]
+    assert _rows(index.mask(excludes=["aqua"])[0]) == [4, 5]
+
+
+def test_unindexed_query_matches_terms_containing_its_words(index):
+    assert _rows(index.mask(contains=["zinc"])[0]) == [3]
+    assert _rows(index.mask(contains=["shea"])[0]) == [5]
+
+
+def test_unknown_ingredients_are_reported(index):
+    mask, unknown = index.mask(contains=["unobtainium"])
+    assert (_rows(mask), unknown) == ([], ["unobtainium"])
+    mask, unknown = index.mask(contains=["water"], excludes=["unobtainium"])
+    assert (_rows(mask), unknown) == ([0, 1, 2, 3], ["unobtainium"])
+
+
+def test_sparse_postings_answer_like_bitmaps(monkeypatch):
+    products = PRODUCTS * 40  # every term in at least 1/64 of the products: all dense
+    dense = IngredientIndex.build(products)
+    monkeypatch.setattr(ingredients, "DENSE_RATIO", 1)  # every term below the threshold: all sparse
+    sparse = IngredientIndex.build(products)
+    assert all(d for d, _ in dense.slots.values()) and not any(d for d, _ in sparse.slots.values())
+    for contains, excludes in [(["water"], ["fragrance"]), (["zinc"], []), ([], ["glycerin"])]:
+        assert _rows(dense.mask(contains, excludes)[0]) == _rows(sparse.mask(contains, excludes)[0])
+
+
+def _write_csv(path, values):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["product_id", "ingredients"])
+        writer.writerows([f"P{i}", v] for i, v in enumerate(values))
+
+
+def test_index_is_persisted_and_memory_mapped(tmp_path, monkeypatch):
+    csv_path = tmp_path / "catalog.csv"
+    _write_csv(csv_path, PRODUCTS)
+    built = load_or_build_index(str(csv_path), str(tmp_path / "cache"), "0123456789abcdef0123")
+    assert (tmp_path / "cache" / f"ingredients-v{ingredients.INDEX_VERSION}-0123456789abcdef").is_dir()
+    assert isinstance(built.dense, np.memmap)
+
+    def no_build(values):
+        raise AssertionError("index rebuilt although a persisted copy exists")
+
+    monkeypatch.setattr(IngredientIndex, "build", no_build)
+    loaded = load_or_build_index(str(csv_path), str(tmp_path / "cache"), "0123456789abcdef0123")
+    assert loaded.terms == built.terms
+    assert _rows(loaded.mask(contains=["aqua"], excludes=["fragrance"])[0]) == [2, 3]
+
+
+def test_index_version_bump_rebuilds(tmp_path, monkeypatch):
+    csv_path = tmp_path / "catalog.csv"
+    _write_csv(csv_path, PRODUCTS)
+    load_or_build_index(str(csv_path), str(tmp_path), "feedfacefeedface")
+    monkeypatch.setattr(ingredients, "INDEX_VERSION", ingredients.INDEX_VERSION + 1)
+    rebuilt = load_or_build_index(str(csv_path), str(tmp_path), "feedfacefeedface")
+    assert sorted(p.name for p in tmp_path.iterdir() if p.is_dir()) == [
+        f"ingredients-v{ingredients.INDEX_VERSION - 1}-feedfacefeedface",
+        f"ingredients-v{ingredients.INDEX_VERSION}-feedfacefeedface",
+    ]
+    assert _rows(rebuilt.mask(contains=["eau"])[0]) == [0, 1, 2, 3]
@@ -0,0 +1,42 @@
+import pytest
+
+from beauty.intents import IntentMatcher
+
+INGREDIENTS = ["fragrance", "alcohol denat", "niacinamide", "parabens", "sulfates", "hyaluronic acid"]
+
+
+@pytest.fixture
+def matcher():
+    return IntentMatcher(["Clinique", "The Ordinary"], ["Dry", "Oily"], ["Serums", "Moisturizers", "Fragrance"],
+                         INGREDIENTS)
+
+
+def test_intent_and_entities(matcher):
+    found = matcher.match("Best Clinique moisturizer with niacinamide for oily skin?")
+    assert found.intent == "recommend"
+    assert found.brands == ["Clinique"]
+    assert found.skin_types == ["Oily"]
+    assert found.categories == ["Moisturizers"]
+    assert found.ingredients == ["niacinamide"]
+    assert found.excluded_ingredients == []
+
+
+@pytest.mark.parametrize("query, contains, excludes", [
+    ("anything fragrance free?", [], ["fragrance"]),
+    ("fragrance-free niacinamide serum", ["niacinamide"], ["fragrance"]),
+    ("serum without fragrance or alcohol denat, with hyaluronic acid", ["hyaluronic acid"],
+     ["fragrance", "alcohol denat"]),
+    ("no parabens, sulfates and fragrance", [], ["parabens", "sulfates", "fragrance"]),
+    ("free of sulfates", [], ["sulfates"]),
+    ("serum with fragrance", ["fragrance"], []),
+    ("niacinamide and fragrance free", ["niacinamide"], ["fragrance"]),
+])
+def test_negated_ingredients_are_excluded(matcher, query, contains, excludes):
+    found = matcher.match(query)
+    assert found.ingredients == contains
+    assert found.excluded_ingredients == excludes
+
+
+def test_negated_phrase_is_not_a_positive_filter_of_another_kind(matcher):
+    assert matcher.match("anything fragrance free?").categories == []
+    assert matcher.match("best fragrance for dry skin").categories == ["Fragrance"]
@@ -0,0 +1,145 @@
+import multiprocessing
+import os
+
+import pytest
+
+from beauty.interaction_log import InteractionLog, fcntl
+
+
+def _rec(i, writer="w"):
+    return {"brand": "B", "product_name": f"{writer}-{i}", "timestamp": "2026-01-01T00:00:00"}
+
+
+def _names(records):
+    return [r["product_name"] for r in records]
+
+
+def _read_all(log, cursor=0):
+    records, cursor = log.read_since(cursor)
+    return _names(records), cursor
+
+
+def test_rotation_names_segments_by_global_offset(tmp_path):
+    log = InteractionLog(str(tmp_path), segment_bytes=200, compact_after=1000)
+    for i in range(40):
+        log.append(_rec(i))
+    segments = log.segments()
+    assert len(segments) > 3
+    # Each segment starts where the previous one ended.
+    for (start, path), (next_start, _) in zip(segments, segments[1:]):
+        assert start + os.path.getsize(path) == next_start
+    names, cursor = _read_all(log)
+    assert names == [f"w-{i}" for i in range(40)]
+    assert cursor == segments[-1][0] + os.path.getsize(segments[-1][1])
+    log.close()
+
+
+def test_cursor_survives_rotation(tmp_path):
+    log = InteractionLog(str(tmp_path), segment_bytes=200, compact_after=1000)
+    for i in range(5):
+        log.append(_rec(i))
+    names, cursor = _read_all(log)
+    assert names == [f"w-{i}" for i in range(5)]
+    for i in range(5, 30):
+        log.append(_rec(i))
+    assert len(log.segments()) > 2
+    names, _ = _read_all(log, cursor)
+    assert names == [f"w-{i}" for i in range(5, 30)]
+    log.close()
+
+
+def test_compaction_keeps_live_cursors_valid(tmp_path):
+    log = InteractionLog(str(tmp_path), segment_bytes=200, compact_after=1000)
+    for i in range(60):
+        log.append(_rec(i))
+    before = log.segments()
+    records, cursor = log.read_since(0, max_records=23)  # a reader stopped mid-segment
+    assert _names(records) == [f"w-{i}" for i in range(23)]
+
+    log.compact()
+    after = log.segments()
+    assert len(after) < len(before)
+    assert after[0][0] == 0 and after[-1] == before[-1]  # the active segment is left alone
+
+    names, _ = _read_all(log, cursor)
+    assert names == [f"w-{i}" for i in range(23, 60)]
+    names, _ = _read_all(log)
+    assert names == [f"w-{i}" for i in range(60)]
+    log.close()
+
+
+def test_rotation_compacts_once_too_many_segments_are_closed(tmp_path):
+    log = InteractionLog(str(tmp_path), segment_bytes=120, compact_after=3)
+    for i in range(80):
+        log.append(_rec(i))
+        assert len(log.segments()) - 1 <= 3
+    names, _ = _read_all(log)
+    assert names == [f"w-{i}" for i in range(80)]
+    log.close()
+
+
+def test_partial_last_line_is_left_for_the_next_read(tmp_path):
+    log = InteractionLog(str(tmp_path))
+    log.append_many([_rec(0), _rec(1)])
+    log.close()
+    _, path = log.segments()[-1]
+    with open(path, "ab") as f:
+        f.write(b'{"brand": "B", "product_na')  # a writer caught mid-line, or a crash
+    names, cursor = _read_all(log)
+    assert names == ["w-0", "w-1"]
+    assert cursor == os.path.getsize(path) - len(b'{"brand": "B", "product_na')
+
+    log = InteractionLog(str(tmp_path))
+    log.append(_rec(2))  # terminates the torn line, which is then skipped
+    names, _ = _read_all(log, cursor)
+    assert names == ["w-2"]
+    log.close()
+
+
+def _writer(directory, writer, n):
+    log = InteractionLog(directory, fsync_every=8, segment_bytes=2048, compact_after=4)
+    i = 0
+    while i < n:
+        batch = [_rec(j, f"p{writer}") for j in range(i, min(n, i + 1 + i % 3))]
+        log.append_many(batch)
+        i += len(batch)
+    log.close()
+
+
+@pytest.mark.skipif(fcntl is None, reason="cross-process locking needs fcntl.flock")
+def test_concurrent_appends_from_several_processes(tmp_path):
+    directory = str(tmp_path)
+    ctx = multiprocessing.get_context("spawn")
+    writers, n = 4, 300
+    procs = [ctx.Process(target=_writer, args=(directory, w, n)) for w in range(writers)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(60)
+        assert p.exitcode == 0
+
+    log = InteractionLog(directory)
+    names, _ = _read_all(log)
+    assert len(names) == writers * n  # no torn or interleaved lines were dropped
+    for w in range(writers):
+        assert [x for x in names if x.startswith(f"p{w}-")] == [f"p{w}-{i}" for i in range(n)]
+    log.close()
+
+
+def test_drop_before_keeps_later_offsets(tmp_path):
+    log = InteractionLog(str(tmp_path), segment_bytes=200, compact_after=1000)
+    for i in range(30):
+        log.append(_rec(i))
+    records, cursor = log.read_since(0, max_records=17)
+    freed = log.drop_before(cursor)
+    assert freed > 0
+    assert all(start + os.path.getsize(path) > cursor for start, path in log.segments()[:-1])
+    names, end = _read_all(log, cursor)
+    assert names == [f"w-{i}" for i in range(17, 30)]
+
+    log.drop_before(end)  # everything consumed: only an empty active segment is left
+    assert [(start, os.path.getsize(path)) for start, path in log.segments()] == [(end, 0)]
+    log.append(_rec(30))
+    names, _ = _read_all(log, end)
+    assert names == ["w-30"]
+    log.close()
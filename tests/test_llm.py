@@ -0,0 +1,91 @@
+import json
+import socket
+import threading
+import time
+import urllib.request
+
+import pytest
+
+from beauty.llm import LLMBackend, build_messages, start_stub
+
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def start(delay):
+        server, url = start_stub(delay=delay)
+        servers.append(server)
+        return server, url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def backends():
+    opened = []
+    yield opened
+    for backend in opened:
+        backend.close()
+
+
+def _stub_requests(url):
+    with urllib.request.urlopen(url + "/stats") as resp:
+        return json.load(resp)["requests"]
+
+
+def _messages(question="best serum for dry skin"):
+    return build_messages(question, "Top pick: Serum X.", "professional")
+
+
+def test_concurrent_identical_questions_share_one_request(stub, backends):
+    _, url = stub(delay=0.3)
+    backend = LLMBackend(url, timeout=5.0)
+    backends.append(backend)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(backend.ask("q", _messages(), "fallback")))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == [("(stub) Question: best serum for dry skin", True)] * 8
+    assert _stub_requests(url) == 1
+    assert backend.requests == 1
+
+
+def test_different_questions_are_not_coalesced(stub, backends):
+    _, url = stub(delay=0.0)
+    backend = LLMBackend(url, timeout=5.0)
+    backends.append(backend)
+    backend.ask("a", _messages("a"), "fallback")
+    backend.ask("b", _messages("b"), "fallback")
+    assert _stub_requests(url) == 2
+
+
+def test_slow_endpoint_falls_back_and_caches_the_late_answer(stub, backends):
+    _, url = stub(delay=0.4)
+    backend = LLMBackend(url, timeout=0.05)
+    backends.append(backend)
+
+    assert backend.ask("q", _messages(), "rule-based") == ("rule-based", False)
+    assert backend.fallbacks == 1
+
+    deadline = time.monotonic() + 5
+    while backend.ask("q", _messages(), "rule-based")[1] is False:
+        assert time.monotonic() < deadline, "late completion was never cached"
+        time.sleep(0.1)
+    assert _stub_requests(url) == 1
+
+
+def test_unreachable_endpoint_falls_back(backends):
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]  # nothing listens here once the socket is closed
+    backend = LLMBackend(f"http://127.0.0.1:{port}/v1", timeout=2.0, request_timeout=1.0)
+    backends.append(backend)
+    assert backend.ask("q", _messages(), "rule-based") == ("rule-based", False)
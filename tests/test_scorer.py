@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from beauty.catalog import SKIN_BITS, Catalog
+from beauty.scorer import Scorer
+
+
+def _catalog(n, seed=0, distinct=3):
+    """Catalog whose rows take only `distinct` values per scored column, so scores tie heavily."""
+    rng = np.random.default_rng(seed)
+    columns = {
+        "product_id": np.array([f"P{i}" for i in range(n)], dtype=object),
+        "name": np.array([f"Product {i}" for i in range(n)], dtype=object),
+        "brand_code": np.zeros(n, dtype=np.int32),
+        "category_code": np.zeros(n, dtype=np.int16),
+        "subcategory": np.array([""] * n, dtype=object),
+        "price": rng.choice([500.0, 1500.0, 4000.0][:distinct], n).astype(np.float32),
+        "rating": rng.choice([3.0, 4.0, 5.0][:distinct], n).astype(np.float32),
+        "loves": rng.choice([10, 1000, 100000][:distinct], n).astype(np.int64),
+        "reviews": np.full(n, 50, dtype=np.int32),
+        "skin_mask": rng.choice([0, SKIN_BITS["Dry"], SKIN_BITS["Oily"]][:distinct], n).astype(np.uint8),
+    }
+    return Catalog(columns, ["Brand"], ["Skincare"])
+
+
+def _full_ranking(scores, candidates=None):
+    rows = np.arange(len(scores)) if candidates is None else np.flatnonzero(candidates)
+    return rows[np.lexsort((rows, -scores[rows]))].tolist()
+
+
+def _all_pages(scorer, k, candidates=None, **query):
+    seen, cursor = [], None
+    while True:
+        rows, cursor = scorer.page(k, candidates=candidates, after=cursor, **query)
+        seen.extend(rows.tolist())
+        if cursor is None:
+            return seen
+
+
+@pytest.mark.parametrize("k", [1, 7, 50, 1000])
+@pytest.mark.parametrize("distinct", [1, 3])
+def test_pages_cover_the_full_sort_once(k, distinct):
+    scorer = Scorer(_catalog(500, distinct=distinct))
+    query = {"skin_type": "Dry", "price_min": 400, "price_max": 2000}
+    expected = _full_ranking(scorer.score(**query))
+    assert _all_pages(scorer, k, **query) == expected
+
+
+def test_pages_respect_candidates():
+    catalog = _catalog(300, seed=1)
+    scorer = Scorer(catalog)
+    candidates = catalog.price <= 1500
+    expected = _full_ranking(scorer.score("Oily"), candidates)
+    assert _all_pages(scorer, 11, candidates=candidates, skin_type="Oily") == expected
+
+
+@pytest.mark.parametrize("k", [1, 5, 64, 299, 300, 301])
+def test_top_k_is_the_head_of_the_full_sort(k):
+    scorer = Scorer(_catalog(300, seed=2))
+    expected = _full_ranking(scorer.score("Dry", 0, 1000))
+    assert scorer.top_k(k, "Dry", 0, 1000).tolist() == expected[:k]
+
+
+def test_empty_candidates():
+    scorer = Scorer(_catalog(20))
+    rows, cursor = scorer.page(5, candidates=np.zeros(20, dtype=bool))
+    assert rows.tolist() == [] and cursor is None
@@ -0,0 +1,149 @@
+import os
+import time
+
+from beauty.firestore_fake import SERVER_TIMESTAMP, FakeFirestore
+from beauty.firestore_sync import FirestoreMirror
+from beauty.interaction_log import InteractionLog
+from beauty.write_behind import WriteBehindQueue
+
+
+def _rec(i, timestamp="2026-01-01T00:00:00"):
+    return {"brand": "B", "product_name": f"p{i}", "skin_type": "Dry", "price_range": "Budget",
+            "price_value": 100, "timestamp": timestamp}
+
+
+def _docs(db):
+    return db._collections.get("product_clicks", {})
+
+
+def _queue(db, tmp_path=None, **kw):
+    kw.setdefault("flush_interval", 0.02)
+    kw.setdefault("backoff", 0.0)
+    spill = InteractionLog(str(tmp_path / "spill")) if tmp_path is not None else None
+    return WriteBehindQueue(db, spill=spill, server_timestamp=SERVER_TIMESTAMP, **kw)
+
+
+def _wait(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+class LateAckFirestore(FakeFirestore):
+    """Applies the first `late_acks` commits but raises afterwards, like a commit that timed out on the client."""
+
+    def __init__(self, late_acks):
+        super().__init__()
+        self.late_acks = late_acks
+
+    def _commit(self, writes):
+        super()._commit(writes)
+        if self.late_acks > 0:
+            self.late_acks -= 1
+            raise TimeoutError("deadline exceeded")
+
+
+def test_groups_records_into_batches():
+    db = FakeFirestore()
+    queue = _queue(db, max_batch=4, flush_interval=10.0)
+    for i in range(10):
+        assert queue.submit(_rec(i))
+    assert queue.flush(timeout=5)
+    queue.close()
+    assert len(_docs(db)) == 10
+    assert db.commits == 3
+    assert queue.stats["committed"] == 10
+
+
+def test_retries_failed_commits():
+    db = FakeFirestore()
+    db.fail_commits = 2
+    queue = _queue(db, max_retries=3)
+    queue.submit(_rec(0))
+    assert queue.flush(timeout=5)
+    queue.close()
+    assert queue.stats["retries"] == 2
+    assert len(_docs(db)) == 1
+
+
+def test_retry_after_late_ack_does_not_duplicate():
+    db = LateAckFirestore(late_acks=1)
+    queue = _queue(db, max_retries=2)
+    for i in range(3):
+        queue.submit(_rec(i))
+    assert queue.flush(timeout=5)
+    queue.close()
+    assert queue.stats["retries"] == 1
+    assert sorted(d["product_name"] for d in _docs(db).values()) == ["p0", "p1", "p2"]
+
+
+def test_spills_when_firestore_stays_down(tmp_path):
+    db = FakeFirestore()
+    db.fail_commits = 100
+    queue = _queue(db, tmp_path, max_retries=1, replay_interval=60.0)
+    queue.submit(_rec(0))
+    assert queue.flush(timeout=5)
+    assert not queue.submit(_rec(1))  # unavailable: straight to the spill log
+    queue.close()
+    assert queue.stats["spilled"] == 2
+    assert not _docs(db)
+    records, _ = queue.spill.read_since(0)
+    assert [r["product_name"] for r in records] == ["p0", "p1"]
+
+
+def test_replayed_records_reach_a_mirror_that_synced_past_them(tmp_path):
+    db = FakeFirestore()
+    mirror = FirestoreMirror(db, str(tmp_path / "mirror.sqlite"), min_interval=0)
+    db.fail_commits = 1
+    queue = _queue(db, tmp_path, max_retries=0, replay_interval=0.05)
+    queue.submit(_rec(0, timestamp="2026-01-01T09:30:00"))
+    _wait(lambda: queue.stats["spilled"] == 1)
+
+    # Another process commits in the meantime and the mirror syncs past the spilled click's time.
+    db.collection("product_clicks").document().set({"brand": "B", "product_name": "other",
+                                                     "timestamp": SERVER_TIMESTAMP})
+    assert mirror.sync() == 1
+
+    _wait(lambda: queue.stats["replayed"] == 1)
+    queue.close()
+    assert mirror.sync() == 1
+    assert mirror.count() == 2
+    (replayed,) = [d for d in _docs(db).values() if d["product_name"] == "p0"]
+    assert replayed["client_timestamp"].isoformat() == "2026-01-01T09:30:00+00:00"
+    records, _ = mirror.read_since(0)
+    assert {r["product_name"]: r["timestamp"] for r in records}["p0"] == "2026-01-01T09:30:00"
+
+
+def test_replay_resumes_after_its_cursor(tmp_path):
+    db = FakeFirestore()
+    db.fail_commits = 1
+    queue = _queue(db, tmp_path, max_retries=0, replay_interval=0.05)
+    queue.submit(_rec(0))
+    _wait(lambda: queue.stats["replayed"] == 1)
+    queue.close()
+
+    again = _queue(db, tmp_path, replay_interval=0.05)
+    time.sleep(0.2)
+    again.close()
+    assert again.stats["replayed"] == 0
+    assert len(_docs(db)) == 1
+
+
+def test_replayed_segments_are_dropped_from_the_spill(tmp_path):
+    db = FakeFirestore()
+    db.fail_commits = 1
+    queue = _queue(db, tmp_path, max_retries=0, replay_interval=0.05)
+    queue.submit(_rec(0))
+    _wait(lambda: queue.stats["replayed"] == 1)
+    spill = queue.spill
+    _wait(lambda: sum(os.path.getsize(p) for _, p in spill.segments()) == 0)
+
+    db.fail_commits = 1  # a second outage spills after the dropped segment
+    queue.submit(_rec(1))
+    _wait(lambda: queue.stats["replayed"] == 2)
+    queue.close()
+    assert sorted(d["product_name"] for d in _docs(db).values()) == ["p0", "p1"]
+    assert sum(os.path.getsize(p) for _, p in spill.segments()) == 0
+    cursor = int((tmp_path / "spill" / "replay.cursor").read_text())
+    assert spill.read_since(cursor) == ([], cursor)